@@ -0,0 +1,205 @@
+"""Бенчмарки горячего пути кадра.
+
+Запускает игру в offscreen-окне Kivy, замеряет время отдельных вызовов
+(физика, отрисовка, текст, HUD, построение экранов) и печатает перцентили.
+Базовая линия хранится в JSON: --save записывает ее, --compare сравнивает
+с ней текущий прогон и завершается с кодом 1 при замедлении.
+
+    python benchmarks/bench_frame.py --save
+    python benchmarks/bench_frame.py --compare
+"""
+import os
+import sys
+
+# Окно без экрана и без разбора аргументов самим Kivy
+os.environ.setdefault('SDL_VIDEODRIVER', 'offscreen')
+os.environ.setdefault('KIVY_NO_ARGS', '1')
+os.environ.setdefault('KIVY_NO_CONSOLELOG', '1')
+
+import argparse
+import json
+import tempfile
+import time
+import traceback
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+PERCENTILES = (50, 90, 99)
+
+def percentile(sorted_values, pct):
+    """Перцентиль по отсортированному списку (ближайший ранг)"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+def measure(func, iterations, warmup):
+    """Время каждого вызова func в микросекундах"""
+    for i in range(warmup):
+        func(i)
+    
+    timings = []
+    perf_counter = time.perf_counter
+    for i in range(iterations):
+        start = perf_counter()
+        func(i)
+        timings.append((perf_counter() - start) * 1e6)
+    
+    timings.sort()
+    result = {f'p{pct}': percentile(timings, pct) for pct in PERCENTILES}
+    result['mean'] = sum(timings) / len(timings)
+    result['calls'] = len(timings)
+    return result
+
+def build_cases(app, main):
+    """Набор замеряемых вызовов: имя -> (функция, число итераций)"""
+    game_view = app.game_view
+    from particles import ParticlePool
+    
+    # Десять игр в истории, чтобы экран рекордов строил полную таблицу
+    for i in range(10):
+        app.history.add_game(main.CHARACTERS[i % len(main.CHARACTERS)], 100 - i, '2024-01-01')
+    
+    # Рой сложного режима на 200 логотипов
+    swarm = main.MultiBoxSimulation(len(main.COLORS), count=200)
+    swarm.start(1)
+    
+    # Вспышка на 500 частиц и проход по 500 живым (не гаснут за замер)
+    burst_pool = ParticlePool(seed=1)
+    live_pool = ParticlePool(seed=1)
+    live_pool.burst(400, 300, 500, 300, 1e9, 6, (1, 1, 1))
+    
+    def burst(i):
+        burst_pool.clear()
+        burst_pool.burst(400, 300, 500, 300, 1.0, 6, (1, 1, 1))
+    
+    # Часы игры идут ровно на шаг физики за вызов, поэтому каждый вызов
+    # update_game делает один шаг. Накопитель начинается с полшага, чтобы
+    # погрешность разности времен не давала кадров без шага или с двумя
+    game_time = [0.0]
+    game_view.clock = main.GameClock(source=lambda: game_time[0])
+    game_view.clock.start()
+    game_view.accumulator = main.PHYSICS_DT / 2
+    
+    # Нулевая зона угла: игра не кончается посреди замера
+    engine = game_view.sim.engine
+    engine.danger_zone = 0
+    engine.solve()
+    
+    def update_game(i):
+        game_time[0] += main.PHYSICS_DT
+        game_view.update_game(main.PHYSICS_DT)
+    
+    return {
+        'GameView.update_game': (update_game, 2000),
+        'GameView.render': (lambda i: game_view.render(), 2000),
+        'DVDScreensaverApp.update_score': (lambda i: app.update_score(i / 60), 2000),
+        'MultiBoxSimulation.step': (lambda i: swarm.step(), 500),
+        'ParticlePool.burst(500)': (burst, 500),
+        'ParticlePool.update': (lambda i: live_pool.update(main.PHYSICS_DT), 500),
+        'DVDScreensaverApp.show_menu': (lambda i: app.show_menu(), 100),
+        'DVDScreensaverApp.show_records': (lambda i: app.show_records(), 100),
+        # Сборка экранов без кэша
+        'DVDScreensaverApp.build_menu': (lambda i: app.build_menu(), 100),
+        'DVDScreensaverApp.build_records': (lambda i: app.build_records(), 100),
+    }
+
+def run_benchmarks(scale):
+    """Прогон всех замеров внутри запущенного приложения"""
+    # Данные игрока пишутся во временную папку, а не рядом с репозиторием
+    os.chdir(tempfile.mkdtemp(prefix='dvd_bench_'))
+    
+    from kivy.clock import Clock
+    import main
+    
+    app = main.DVDScreensaverApp()
+    results = {}
+    errors = []
+    
+    def run(dt):
+        try:
+            app.start_game()
+            # Свой Clock игры не должен вмешиваться в замеры
+            app.game_view.game_loop_event.cancel()
+            
+            # Сначала вызовы игры, затем построители экранов
+            for name, (func, iterations) in build_cases(app, main).items():
+                warmup = 5 if name.startswith(('DVDScreensaverApp.show_', 'DVDScreensaverApp.build_')) else 50
+                results[name] = measure(func, max(1, int(iterations * scale)), warmup)
+            app.game_view.stop()
+        except Exception:
+            errors.append(traceback.format_exc())
+        finally:
+            app.stop()
+    
+    Clock.schedule_once(run, 0)
+    app.run()
+    
+    if errors:
+        raise RuntimeError(errors[0])
+    return results
+
+def print_results(results, baseline=None):
+    """Таблица результатов (мкс) и, если есть, отношение к базовой линии"""
+    header = f"{'вызов':<34}" + ''.join(f"{f'p{pct}':>10}" for pct in PERCENTILES) + f"{'среднее':>10}"
+    if baseline:
+        header += f"{'p50/база':>10}"
+    print(header)
+    
+    for name, stats in results.items():
+        line = f"{name:<34}" + ''.join(f"{stats[f'p{pct}']:>10.1f}" for pct in PERCENTILES)
+        line += f"{stats['mean']:>10.1f}"
+        if baseline and name in baseline:
+            line += f"{stats['p50'] / max(baseline[name]['p50'], 1e-9):>10.2f}"
+        print(line)
+
+def compare(results, baseline, tolerance):
+    """Список вызовов, у которых p50 вырос больше допуска"""
+    regressions = []
+    for name, stats in results.items():
+        if name not in baseline:
+            continue
+        limit = baseline[name]['p50'] * (1 + tolerance)
+        if stats['p50'] > limit:
+            regressions.append((name, baseline[name]['p50'], stats['p50']))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарки горячего пути кадра")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="Файл базовой линии (JSON)")
+    parser.add_argument('--save', action='store_true', help="Сохранить результат как базовую линию")
+    parser.add_argument('--compare', action='store_true', help="Сравнить с базовой линией")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="Допустимый рост p50 (доля)")
+    parser.add_argument('--scale', type=float, default=1.0, help="Множитель числа итераций")
+    args = parser.parse_args()
+    
+    results = run_benchmarks(args.scale)
+    
+    baseline = None
+    if args.compare:
+        if not os.path.exists(args.baseline):
+            print(f"Нет базовой линии: {args.baseline}")
+            return 2
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+    
+    print_results(results, baseline)
+    
+    if args.save:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({'python': sys.version.split()[0], 'results': results}, f, ensure_ascii=False, indent=2)
+        print(f"Базовая линия сохранена: {args.baseline}")
+    
+    if baseline:
+        regressions = compare(results, baseline, args.tolerance)
+        for name, base, current in regressions:
+            print(f"ЗАМЕДЛЕНИЕ {name}: p50 {base:.1f} -> {current:.1f} мкс")
+        if regressions:
+            return 1
+    
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -10,10 +10,12 @@ source.dir = .
 source.main = main.py
 # Все нужные файлы для игры
 source.include_exts = py,png,jpg,jpeg,JPG,PNG,kv,atlas,ttf,otf,json,txt,xml,wav,mp3
+# Бенчмарки в APK не нужны
+source.exclude_dirs = benchmarks
 version = 1.0
 
-# Требования (только Kivy)
-requirements = python3,kivy==2.3.0
+# Требования (Kivy и модуль sqlite3 для истории игр)
+requirements = python3,kivy==2.3.0,sqlite3
 
 # Иконка (добавьте icon512.png 512x512)
 icon.filename = icon.png
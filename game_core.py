@@ -0,0 +1,824 @@
+"""Ядро симуляции DVD-игры без зависимости от Kivy.
+
+Состояние квадрата и шаг физики (то, что раньше жило в GameView),
+пригодные для запуска без окна, и пакетный режим на NumPy для
+статистики времени до угла по множеству независимых квадратов.
+
+Каждая игра идет на своем генераторе со случайным зерном, а счет
+считается в тиках физики, поэтому журнал сессии (зерно, тики нажатий,
+финальный тик) однозначно воспроизводит игру и проверяет рекорд.
+
+Сложный режим (MultiBoxSimulation) добавляет рой маленьких логотипов в
+плоских массивах: они отскакивают от стен, зон углов, друг от друга и от
+логотипа игрока, а игрок отскакивает от них. Пары кандидатов на
+столкновение ищутся по равномерной сетке, а не перебором всех пар.
+Режим игры пишется в журнал сессии, повтор строит ту же симуляцию.
+"""
+import argparse
+import base64
+import json
+import math
+import random
+import sys
+import time
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # NumPy нужен только для пакетного режима
+    np = None
+
+# Константы поля (логические единицы)
+CANVAS_WIDTH = 800
+CANVAS_HEIGHT = 600
+BOX_SIZE = 100
+INITIAL_SPEED = 4.0
+CORNER_DANGER_ZONE = 70
+PHYSICS_DT = 1/60  # Фиксированный шаг физики (скорости заданы в пикселях за шаг)
+COLOR_COUNT = 4  # Число цветов логотипа (палитра COLORS в main.py)
+MULTI_LOGO_COUNT = 120  # Логотипов роя в сложном режиме
+MULTI_LOGO_SIZE = 28  # Сторона логотипа роя (она же ячейка сетки столкновений)
+MULTI_PLAYER_MASS = 3.0  # Масса игрока в массах логотипа роя (по площади игрок сгребал бы рой)
+
+# Углы игрового поля
+CORNERS = [
+    (0, 0),
+    (CANVAS_WIDTH, 0),
+    (0, CANVAS_HEIGHT),
+    (CANVAS_WIDTH, CANVAS_HEIGHT)
+]
+
+class GameClock:
+    """Игровые часы на монотонном источнике.
+    
+    Учитывают паузы (время стоит) и масштаб времени для замедления
+    и ускорения. Игровое время не зависит от перевода системных часов.
+    """
+    
+    def __init__(self, source=time.monotonic):
+        self.source = source
+        self.time_scale = 1.0
+        
+        # Игровое время на момент anchor; anchor = None - часы стоят
+        self.base = 0.0
+        self.anchor = None
+        self.last_tick = 0.0
+    
+    def start(self):
+        """Запуск с нуля"""
+        self.base = 0.0
+        self.last_tick = 0.0
+        self.anchor = self.source()
+    
+    def is_running(self):
+        """Идут ли часы"""
+        return self.anchor is not None
+    
+    def elapsed(self):
+        """Игровое время в секундах"""
+        if self.anchor is None:
+            return self.base
+        return self.base + (self.source() - self.anchor) * self.time_scale
+    
+    def pause(self):
+        """Остановка часов"""
+        if self.anchor is not None:
+            self.base = self.elapsed()
+            self.anchor = None
+    
+    def resume(self):
+        """Продолжение после паузы"""
+        if self.anchor is None:
+            self.anchor = self.source()
+    
+    def set_time_scale(self, time_scale):
+        """Смена масштаба времени без скачка уже прошедшего времени"""
+        if self.anchor is not None:
+            self.base = self.elapsed()
+            self.anchor = self.source()
+        self.time_scale = time_scale
+    
+    def tick(self):
+        """Игровое время, прошедшее с прошлого вызова"""
+        now = self.elapsed()
+        delta = now - self.last_tick
+        self.last_tick = now
+        return delta
+
+class TrajectoryEngine:
+    """Аналитический движок траектории квадрата.
+    
+    Между отскоками движение линейно, поэтому время следующего удара о стену
+    и входа центра квадрата в зону угла решается в замкнутой форме один раз
+    на отрезок. Пересчет - только после отскока или смены направления.
+    Время измеряется в тиках физики (скорости - пиксели за тик).
+    """
+    
+    def __init__(self, danger_zone=CORNER_DANGER_ZONE):
+        self.danger_zone = danger_zone
+        
+        # Начало текущего отрезка
+        self.t0 = 0.0
+        self.x0 = 0.0
+        self.y0 = 0.0
+        self.vx = 0.0
+        self.vy = 0.0
+        
+        # Ближайшие события
+        self.bounce_time = math.inf
+        self.bounce_x = False
+        self.bounce_y = False
+        self.corner_time = math.inf
+        self.corner_index = -1
+    
+    def reset(self, t, x, y, vx, vy):
+        """Новый отрезок из точки (x, y) в момент t"""
+        self.t0 = t
+        self.x0 = x
+        self.y0 = y
+        self.vx = vx
+        self.vy = vy
+        self.solve()
+    
+    def position_at(self, t):
+        """Позиция квадрата в момент t внутри текущего отрезка"""
+        dt = t - self.t0
+        return self.x0 + self.vx * dt, self.y0 + self.vy * dt
+    
+    def reflected_position_at(self, t):
+        """Позиция в момент t с зеркальным отскоком от стен (для отрисовки)
+        
+        Не меняет отрезок: отскоки обрабатывает advance_to на шаге физики.
+        Верна, пока до t не больше одного отскока по каждой оси.
+        """
+        x, y = self.position_at(t)
+        max_x = CANVAS_WIDTH - BOX_SIZE
+        max_y = CANVAS_HEIGHT - BOX_SIZE
+        if x < 0:
+            x = -x
+        elif x > max_x:
+            x = 2 * max_x - x
+        if y < 0:
+            y = -y
+        elif y > max_y:
+            y = 2 * max_y - y
+        return x, y
+    
+    @staticmethod
+    def wall_time(p, v, max_p):
+        """Время до стены по одной оси"""
+        if v > 0:
+            return max(0.0, (max_p - p) / v)
+        if v < 0:
+            return max(0.0, -p / v)
+        return math.inf
+    
+    def solve(self):
+        """Решение событий текущего отрезка"""
+        tx = self.wall_time(self.x0, self.vx, CANVAS_WIDTH - BOX_SIZE)
+        ty = self.wall_time(self.y0, self.vy, CANVAS_HEIGHT - BOX_SIZE)
+        span = min(tx, ty)
+        self.bounce_time = self.t0 + span
+        # Одновременный отскок по двум осям (точно в угол)
+        self.bounce_x = tx <= span + 1e-9
+        self.bounce_y = ty <= span + 1e-9
+        
+        # Вход центра в круг угла: |d + v*s| = R, наименьший корень s в [0, span]
+        self.corner_time = math.inf
+        self.corner_index = -1
+        a = self.vx * self.vx + self.vy * self.vy
+        center_x = self.x0 + BOX_SIZE / 2.0
+        center_y = self.y0 + BOX_SIZE / 2.0
+        
+        for i, (corner_x, corner_y) in enumerate(CORNERS):
+            dx = center_x - corner_x
+            dy = center_y - corner_y
+            c = dx * dx + dy * dy - self.danger_zone * self.danger_zone
+            if c < 0:
+                s = 0.0
+            elif a == 0:
+                continue
+            else:
+                b = 2 * (dx * self.vx + dy * self.vy)
+                disc = b * b - 4 * a * c
+                if disc < 0 or b >= 0:
+                    continue
+                s = (-b - math.sqrt(disc)) / (2 * a)
+                if s > span:
+                    continue
+            if self.t0 + s < self.corner_time:
+                self.corner_time = self.t0 + s
+                self.corner_index = i
+    
+    def advance_to(self, t, on_bounce=None):
+        """Обработка всех отскоков до момента t (до входа в угол, если он раньше)"""
+        while self.bounce_time <= t and self.bounce_time < self.corner_time:
+            bounce_time = self.bounce_time
+            x, y = self.position_at(bounce_time)
+            vx, vy = self.vx, self.vy
+            
+            if self.bounce_x:
+                x = 0.0 if vx < 0 else CANVAS_WIDTH - BOX_SIZE
+                vx = -vx
+            if self.bounce_y:
+                y = 0.0 if vy < 0 else CANVAS_HEIGHT - BOX_SIZE
+                vy = -vy
+            
+            self.reset(bounce_time, x, y, vx, vy)
+            if on_bounce:
+                on_bounce(bounce_time, x, y)
+    
+    def corner_reached(self, t):
+        """Вошел ли квадрат в зону угла к моменту t"""
+        return self.corner_time <= t
+
+class GameSimulation:
+    """Состояние одной игры и ее шаг физики"""
+    
+    mode = 'normal'  # Режим игры в журнале сессии и истории
+    
+    def __init__(self, color_count=COLOR_COUNT, speed=INITIAL_SPEED,
+                 danger_zone=CORNER_DANGER_ZONE):
+        self.color_count = color_count
+        self.speed = speed
+        
+        # Свой генератор на сессию: игра воспроизводится по зерну
+        self.seed = 0
+        self.rng = random.Random(0)
+        self.tap_ticks = array('I')
+        
+        # Состояние квадрата
+        self.box_x = (CANVAS_WIDTH - BOX_SIZE) / 2.0
+        self.box_y = (CANVAS_HEIGHT - BOX_SIZE) / 2.0
+        self.velocity_x = speed
+        self.velocity_y = speed
+        self.box_color_index = 0
+        
+        # Номер тика физики
+        self.tick = 0
+        self.engine = TrajectoryEngine(danger_zone)
+        
+        # Статистика игры для истории
+        self.bounces = 0
+        self.taps = 0
+    
+    def start(self, seed=None):
+        """Центр поля, случайные направление и цвет из генератора сессии"""
+        self.seed = random.getrandbits(32) if seed is None else seed
+        self.rng.seed(self.seed)
+        self.tap_ticks = array('I')
+        
+        angle = self.rng.uniform(0, 2 * math.pi)
+        self.velocity_x = math.cos(angle) * self.speed
+        self.velocity_y = math.sin(angle) * self.speed
+        
+        self.box_x = (CANVAS_WIDTH - BOX_SIZE) / 2.0
+        self.box_y = (CANVAS_HEIGHT - BOX_SIZE) / 2.0
+        
+        self.box_color_index = self.rng.randint(0, self.color_count - 1)
+        
+        # Траектория решается аналитически от текущей точки
+        self.tick = 0
+        self.bounces = 0
+        self.taps = 0
+        self.engine.reset(0, self.box_x, self.box_y, self.velocity_x, self.velocity_y)
+    
+    def check_corner_collision(self):
+        """Проверка столкновения с углами"""
+        # Время входа в зону угла уже известно движку траектории
+        return self.engine.corner_reached(self.tick)
+    
+    def danger_corner(self):
+        """Индекс угла, в зоне которого квадрат, или -1"""
+        return self.engine.corner_index if self.check_corner_collision() else -1
+    
+    def on_bounce(self, bounce_time, x, y):
+        """Отскок от стены в точный момент bounce_time"""
+        self.bounces += 1
+        self.box_color_index = self.rng.randint(0, self.color_count - 1)
+    
+    def step(self):
+        """Один фиксированный шаг физики. Возвращает True при попадании в угол"""
+        self.tick += 1
+        
+        # Отскоки обрабатываются только когда наступает их время
+        engine = self.engine
+        if engine.bounce_time <= self.tick:
+            engine.advance_to(self.tick, self.on_bounce)
+            self.velocity_x = engine.vx
+            self.velocity_y = engine.vy
+        
+        self.box_x, self.box_y = engine.position_at(self.tick)
+        
+        return self.check_corner_collision()
+    
+    def seek(self, tick):
+        """Переход сразу к тику tick: отскоки обрабатываются по событиям"""
+        self.tick = tick
+        engine = self.engine
+        engine.advance_to(tick, self.on_bounce)
+        self.velocity_x = engine.vx
+        self.velocity_y = engine.vy
+        self.box_x, self.box_y = engine.position_at(tick)
+        return self.check_corner_collision()
+    
+    def score(self):
+        """Счет в секундах игрового времени по числу тиков"""
+        return self.tick * PHYSICS_DT
+    
+    def session_log(self):
+        """Журнал сессии для проверки рекорда"""
+        return {
+            'mode': self.mode,
+            'seed': self.seed,
+            'ticks': self.tick,
+            'tap_ticks': encode_ticks(self.tap_ticks),
+        }
+    
+    def hit_test(self, x, y):
+        """Попадает ли точка поля в квадрат"""
+        return (self.box_x <= x <= self.box_x + BOX_SIZE and
+                self.box_y <= y <= self.box_y + BOX_SIZE)
+    
+    def redirect(self):
+        """Случайная смена направления с сохранением скорости"""
+        angle = self.rng.uniform(0, 2 * math.pi)
+        speed = math.sqrt(self.velocity_x ** 2 + self.velocity_y ** 2)
+        self.taps += 1
+        self.tap_ticks.append(self.tick)
+        self.velocity_x = math.cos(angle) * speed
+        self.velocity_y = math.sin(angle) * speed
+        
+        # Пересчет траектории от текущей точки
+        self.engine.reset(self.tick, self.box_x, self.box_y,
+                          self.velocity_x, self.velocity_y)
+
+class MultiBoxSimulation(GameSimulation):
+    """Сложный режим: логотип игрока и рой логотипов в плоских массивах.
+    
+    Логотип игрока живет по правилам обычной игры на аналитической
+    траектории, но удар о логотип роя отклоняет его направление (упругий
+    удар, игрок в MULTI_PLAYER_MASS раз тяжелее) - новый отрезок
+    траектории, как после нажатия. Рой отскакивает от стен, зон углов,
+    друг от друга и от игрока. Удары меняют только направления, скорость
+    каждого логотипа постоянна. У роя свой генератор от зерна сессии: его
+    цвета не сдвигают случайность игрока, а повтор сессии шагает рой
+    вместе с игроком.
+    """
+    
+    mode = 'multi'
+    
+    def __init__(self, color_count=COLOR_COUNT, speed=INITIAL_SPEED,
+                 danger_zone=CORNER_DANGER_ZONE, count=MULTI_LOGO_COUNT, logo_size=MULTI_LOGO_SIZE):
+        super().__init__(color_count, speed, danger_zone)
+        self.count = count
+        self.logo_size = logo_size
+        self.swarm_rng = random.Random(0)
+        
+        # Состояние роя
+        self.xs = array('d', bytes(8 * count))
+        self.ys = array('d', bytes(8 * count))
+        self.vxs = array('d', bytes(8 * count))
+        self.vys = array('d', bytes(8 * count))
+        self.colors = array('B', bytes(count))
+        
+        # Сетка столкновений: ячейка со стороной логотипа -> индексы роя
+        self.grid_columns = int(math.ceil(CANVAS_WIDTH / logo_size))
+        self.grid = {}
+    
+    def start(self, seed=None):
+        """Игрок как в обычной игре, рой в случайных свободных точках"""
+        super().start(seed)
+        rng = self.swarm_rng
+        rng.seed(f'{self.seed}:swarm')
+        
+        # Несколько попыток найти место вне игрока, зон углов и соседей
+        size = self.logo_size
+        for i in range(self.count):
+            for attempt in range(20):
+                x = rng.uniform(0, CANVAS_WIDTH - size)
+                y = rng.uniform(0, CANVAS_HEIGHT - size)
+                if self.place_free(i, x, y):
+                    break
+            angle = rng.uniform(0, 2 * math.pi)
+            self.xs[i] = x
+            self.ys[i] = y
+            self.vxs[i] = math.cos(angle) * self.speed
+            self.vys[i] = math.sin(angle) * self.speed
+            self.colors[i] = rng.randint(0, self.color_count - 1)
+    
+    def place_free(self, index, x, y):
+        """Свободна ли точка для логотипа роя при начальной расстановке"""
+        size = self.logo_size
+        reach = self.engine.danger_zone + size
+        center_x = x + size / 2.0
+        center_y = y + size / 2.0
+        for corner_x, corner_y in CORNERS:
+            if (center_x - corner_x) ** 2 + (center_y - corner_y) ** 2 < reach * reach:
+                return False
+        if (self.box_x - size < x < self.box_x + BOX_SIZE and
+                self.box_y - size < y < self.box_y + BOX_SIZE):
+            return False
+        xs, ys = self.xs, self.ys
+        for j in range(index):
+            if abs(xs[j] - x) < size and abs(ys[j] - y) < size:
+                return False
+        return True
+    
+    def step(self):
+        """Шаг игрока и роя. Возвращает True при попадании игрока в угол"""
+        reached = super().step()
+        self.move_swarm()
+        self.collide_corners()
+        self.collide_swarm()
+        self.collide_player()
+        return reached
+    
+    def seek(self, tick):
+        """Шаги до тика tick: рой не решается аналитически, каждый тик шагает весь рой"""
+        while self.tick < tick:
+            if self.step():
+                return True
+        return self.check_corner_collision()
+    
+    def move_swarm(self):
+        """Движение роя и отскоки от стен (отскок меняет цвет)"""
+        xs, ys, vxs, vys, colors = self.xs, self.ys, self.vxs, self.vys, self.colors
+        randint = self.swarm_rng.randint
+        color_max = self.color_count - 1
+        max_x = CANVAS_WIDTH - self.logo_size
+        max_y = CANVAS_HEIGHT - self.logo_size
+        for i in range(self.count):
+            x = xs[i] + vxs[i]
+            y = ys[i] + vys[i]
+            bounced = False
+            if x < 0.0 or x > max_x:
+                x = -x if x < 0.0 else 2 * max_x - x
+                vxs[i] = -vxs[i]
+                bounced = True
+            if y < 0.0 or y > max_y:
+                y = -y if y < 0.0 else 2 * max_y - y
+                vys[i] = -vys[i]
+                bounced = True
+            xs[i] = x
+            ys[i] = y
+            if bounced:
+                colors[i] = randint(0, color_max)
+    
+    def collide_corners(self):
+        """Отскок роя от кругов зон углов (отражение скорости по нормали)"""
+        xs, ys, vxs, vys = self.xs, self.ys, self.vxs, self.vys
+        half = self.logo_size / 2.0
+        reach = self.engine.danger_zone + half
+        for i in range(self.count):
+            center_x = xs[i] + half
+            center_y = ys[i] + half
+            # Зоны углов лежат у стен: логотип вдали от них не проверяется
+            if reach < center_x < CANVAS_WIDTH - reach or reach < center_y < CANVAS_HEIGHT - reach:
+                continue
+            for corner_x, corner_y in CORNERS:
+                dx = center_x - corner_x
+                dy = center_y - corner_y
+                distance = math.sqrt(dx * dx + dy * dy)
+                if distance >= reach or distance == 0.0:
+                    continue
+                nx = dx / distance
+                ny = dy / distance
+                xs[i] += nx * (reach - distance)
+                ys[i] += ny * (reach - distance)
+                dot = vxs[i] * nx + vys[i] * ny
+                if dot < 0.0:
+                    vxs[i] -= 2 * dot * nx
+                    vys[i] -= 2 * dot * ny
+    
+    def collide_swarm(self):
+        """Столкновения внутри роя: кандидаты только из своей и соседних ячеек сетки"""
+        xs, ys, vxs, vys = self.xs, self.ys, self.vxs, self.vys
+        size = self.logo_size
+        half = size / 2.0
+        columns = self.grid_columns
+        
+        # Ячейка по центру логотипа: пересекающиеся логотипы - в соседних ячейках
+        grid = self.grid
+        grid.clear()
+        for i in range(self.count):
+            key = int((ys[i] + half) // size) * columns + int((xs[i] + half) // size)
+            cell = grid.get(key)
+            if cell is None:
+                grid[key] = [i]
+            else:
+                cell.append(i)
+        
+        # Своя ячейка и половина соседей: каждая пара проверяется один раз.
+        # Равные массы - обмен компонентами скорости по оси удара
+        offsets = (0, 1, columns - 1, columns, columns + 1)
+        get = grid.get
+        for key, cell in grid.items():
+            for offset in offsets:
+                other = cell if offset == 0 else get(key + offset)
+                if other is None:
+                    continue
+                for a, i in enumerate(cell):
+                    for b in range(a + 1 if offset == 0 else 0, len(other)):
+                        j = other[b]
+                        dx = xs[j] - xs[i]
+                        dy = ys[j] - ys[i]
+                        if not (-size < dx < size and -size < dy < size):
+                            continue
+                        if size - abs(dx) < size - abs(dy):
+                            shift = (size - abs(dx)) / 2.0 * (1.0 if dx > 0 else -1.0)
+                            xs[i] -= shift
+                            xs[j] += shift
+                            if (vxs[j] - vxs[i]) * shift < 0.0:
+                                vxs[i], vxs[j] = vxs[j], vxs[i]
+                        else:
+                            shift = (size - abs(dy)) / 2.0 * (1.0 if dy > 0 else -1.0)
+                            ys[i] -= shift
+                            ys[j] += shift
+                            if (vys[j] - vys[i]) * shift < 0.0:
+                                vys[i], vys[j] = vys[j], vys[i]
+                        self.keep_speed(i)
+                        self.keep_speed(j)
+    
+    def collide_player(self):
+        """Удары игрока и роя: упругий удар по оси
+        
+        Игрок тяжелее логотипа роя и отклоняется от него, скорость игрока
+        сохраняется. Логотип, прижатый к стене, уступает: уходит вдоль стены
+        и игрока не отклоняет, иначе прижатые логотипы не пускали бы игрока
+        к стенам и углам.
+        """
+        xs, ys, vxs, vys = self.xs, self.ys, self.vxs, self.vys
+        size = self.logo_size
+        half = size / 2.0
+        columns = self.grid_columns
+        reach = (BOX_SIZE + size) / 2.0
+        max_x = CANVAS_WIDTH - size
+        max_y = CANVAS_HEIGHT - size
+        center_x = self.box_x + BOX_SIZE / 2.0
+        center_y = self.box_y + BOX_SIZE / 2.0
+        
+        # Доли обмена импульсом при упругом ударе: 2m/(M+m) для игрока, 2M/(M+m) для роя
+        player_share = 2.0 / (MULTI_PLAYER_MASS + 1.0)
+        logo_share = 2.0 * MULTI_PLAYER_MASS / (MULTI_PLAYER_MASS + 1.0)
+        vx = self.velocity_x
+        vy = self.velocity_y
+        
+        # Ячейки, в которых может быть центр задевающего игрока логотипа
+        for row in range(int((center_y - reach) // size), int((center_y + reach) // size) + 1):
+            for column in range(max(0, int((center_x - reach) // size)),
+                                min(columns, int((center_x + reach) // size) + 1)):
+                for j in self.grid.get(row * columns + column, ()):
+                    dx = xs[j] + half - center_x
+                    dy = ys[j] + half - center_y
+                    if not (-reach < dx < reach and -reach < dy < reach):
+                        continue
+                    if reach - abs(dx) < reach - abs(dy):
+                        sign = 1.0 if dx > 0 else -1.0
+                        x = center_x + sign * reach - half
+                        if 0.0 <= x <= max_x:
+                            xs[j] = x
+                            relative = vxs[j] - vx
+                            if relative * sign < 0.0:
+                                vx += player_share * relative
+                                vxs[j] -= logo_share * relative
+                        else:
+                            side = 1.0 if dy > 0 else -1.0
+                            ys[j] = min(max_y, max(0.0, center_y + side * reach - half))
+                    else:
+                        sign = 1.0 if dy > 0 else -1.0
+                        y = center_y + sign * reach - half
+                        if 0.0 <= y <= max_y:
+                            ys[j] = y
+                            relative = vys[j] - vy
+                            if relative * sign < 0.0:
+                                vy += player_share * relative
+                                vys[j] -= logo_share * relative
+                        else:
+                            side = 1.0 if dx > 0 else -1.0
+                            xs[j] = min(max_x, max(0.0, center_x + side * reach - half))
+                    self.keep_speed(j)
+        
+        # Отклоненный игрок - прежняя скорость, новый отрезок траектории
+        if vx != self.velocity_x or vy != self.velocity_y:
+            current = math.sqrt(vx * vx + vy * vy)
+            if current > 0.0:
+                speed = math.sqrt(self.velocity_x ** 2 + self.velocity_y ** 2)
+                self.velocity_x = vx * speed / current
+                self.velocity_y = vy * speed / current
+                self.engine.reset(self.tick, self.box_x, self.box_y,
+                                  self.velocity_x, self.velocity_y)
+    
+    def keep_speed(self, i):
+        """Возврат модуля скорости логотипа роя к скорости игры"""
+        vx = self.vxs[i]
+        vy = self.vys[i]
+        current = math.sqrt(vx * vx + vy * vy)
+        if current > 0.0:
+            self.vxs[i] = vx * self.speed / current
+            self.vys[i] = vy * self.speed / current
+
+# Симуляция по режиму из журнала сессии
+SIMULATIONS = {simulation.mode: simulation for simulation in (GameSimulation, MultiBoxSimulation)}
+
+def encode_ticks(ticks):
+    """Тики нажатий -> base64 от uint32 little-endian"""
+    data = array('I', ticks)
+    if sys.byteorder == 'big':
+        data.byteswap()
+    return base64.b64encode(data.tobytes()).decode('ascii')
+
+def decode_ticks(text):
+    """base64 от uint32 little-endian -> тики нажатий"""
+    data = array('I')
+    data.frombytes(base64.b64decode(text or ''))
+    if sys.byteorder == 'big':
+        data.byteswap()
+    return data
+
+def verify_session(record, color_count=COLOR_COUNT, speed=INITIAL_SPEED,
+                   danger_zone=CORNER_DANGER_ZONE):
+    """Повтор сессии по журналу записи. Возвращает (ok, причина)
+    
+    Обычная сессия переходит от нажатия к нажатию по событиям траектории
+    и повторяется в десятки тысяч раз быстрее реального времени. Игрок
+    сложного режима отскакивает от роя, поэтому его повтор шагает все
+    логотипы роя каждый тик и быстрее реального времени лишь в десятки
+    раз (около 40 на 120 логотипах): проверка рекордов сложного режима на
+    порядки медленнее обычной.
+    """
+    if record.get('seed') is None or record.get('ticks') is None:
+        return False, 'нет журнала'
+    
+    simulation = SIMULATIONS.get(record.get('mode') or GameSimulation.mode)
+    if simulation is None:
+        return False, f"неизвестный режим {record['mode']}"
+    
+    ticks = record['ticks']
+    sim = simulation(color_count, speed, danger_zone)
+    sim.start(record['seed'])
+    
+    # Между нажатиями физика не шагает: переход сразу к тику нажатия
+    last_tick = 0
+    for tick in decode_ticks(record.get('tap_ticks')):
+        if tick < last_tick or tick >= ticks:
+            return False, f'нажатие вне игры на тике {tick}'
+        if sim.seek(tick):
+            return False, f'нажатие после угла на тике {tick}'
+        sim.redirect()
+        last_tick = tick
+    
+    # Игра кончается на первом тике внутри зоны угла
+    if not sim.seek(ticks) or sim.engine.corner_reached(ticks - 1):
+        return False, 'угол не на финальном тике'
+    if abs(sim.score() - record.get('score', sim.score())) > 1e-6:
+        return False, 'счет не совпадает с числом тиков'
+    if record.get('bounces') is not None and record['bounces'] != sim.bounces:
+        return False, 'число отскоков не совпадает'
+    return True, 'ok'
+
+def verify_records(records):
+    """Проверка списка рекордов: [(запись, ok, причина)] и ускорение к реальному времени по режимам"""
+    results = []
+    elapsed = {}
+    replayed = {}
+    for record in records:
+        mode = record.get('mode') or GameSimulation.mode
+        start = time.perf_counter()
+        results.append((record, *verify_session(record)))
+        elapsed[mode] = elapsed.get(mode, 0.0) + time.perf_counter() - start
+        replayed[mode] = replayed.get(mode, 0.0) + (record.get('ticks') or 0) * PHYSICS_DT
+    return results, {mode: replayed[mode] / max(elapsed[mode], 1e-9) for mode in elapsed}
+
+class BatchSimulation:
+    """Пакетный режим на NumPy: множество независимых квадратов без касаний.
+    
+    Каждая итерация продвигает все живые квадраты сразу к их следующему
+    событию (отскок или вход в угол) теми же формулами, что TrajectoryEngine.
+    Квадраты, дошедшие до угла, выбывают из массивов.
+    """
+    
+    def __init__(self, count, speed=INITIAL_SPEED, danger_zone=CORNER_DANGER_ZONE, seed=None):
+        if np is None:
+            raise RuntimeError("Пакетный режим требует NumPy")
+        
+        self.count = count
+        self.speed = speed
+        self.danger_zone = danger_zone
+        self.rng = np.random.default_rng(seed)
+    
+    def run(self, max_ticks):
+        """Время входа в угол (в тиках) для каждого квадрата, inf - не дошел"""
+        count = self.count
+        max_x = CANVAS_WIDTH - BOX_SIZE
+        max_y = CANVAS_HEIGHT - BOX_SIZE
+        half = BOX_SIZE / 2.0
+        r2 = self.danger_zone * self.danger_zone
+        
+        angle = self.rng.uniform(0, 2 * math.pi, count)
+        vx = np.cos(angle) * self.speed
+        vy = np.sin(angle) * self.speed
+        x = np.full(count, max_x / 2.0)
+        y = np.full(count, max_y / 2.0)
+        t = np.zeros(count)
+        ids = np.arange(count)
+        result = np.full(count, np.inf)
+        
+        # Центр не подходит к углу ближе half * sqrt(2): такая зона недостижима
+        if 2 * half * half >= r2:
+            return result
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            while ids.size:
+                # Время до стены по осям
+                tx = np.where(vx > 0, (max_x - x) / vx,
+                              np.where(vx < 0, -x / vx, np.inf))
+                ty = np.where(vy > 0, (max_y - y) / vy,
+                              np.where(vy < 0, -y / vy, np.inf))
+                tx = np.maximum(tx, 0.0)
+                ty = np.maximum(ty, 0.0)
+                span = np.minimum(tx, ty)
+                
+                # Наименьший корень |d + v*s| = R по всем углам
+                a = vx * vx + vy * vy
+                entry = np.full(ids.size, np.inf)
+                for corner_x, corner_y in CORNERS:
+                    dx = x + half - corner_x
+                    dy = y + half - corner_y
+                    c = dx * dx + dy * dy - r2
+                    b = 2 * (dx * vx + dy * vy)
+                    disc = b * b - 4 * a * c
+                    s = (-b - np.sqrt(np.maximum(disc, 0.0))) / (2 * a)
+                    s = np.where((disc >= 0) & (b < 0) & (s <= span), s, np.inf)
+                    s = np.where(c < 0, 0.0, s)
+                    entry = np.minimum(entry, s)
+                
+                # Вход в угол завершает квадрат
+                hit = np.isfinite(entry)
+                result[ids[hit]] = t[hit] + entry[hit]
+                
+                # Остальные переходят к точке отскока
+                t = t + span
+                keep = ~hit & (t <= max_ticks)
+                x = x + vx * span
+                y = y + vy * span
+                bounce_x = tx <= span + 1e-9
+                bounce_y = ty <= span + 1e-9
+                x = np.where(bounce_x, np.where(vx < 0, 0.0, max_x), x)
+                y = np.where(bounce_y, np.where(vy < 0, 0.0, max_y), y)
+                vx = np.where(bounce_x, -vx, vx)
+                vy = np.where(bounce_y, -vy, vy)
+                
+                ids, x, y, vx, vy, t = ids[keep], x[keep], y[keep], vx[keep], vy[keep], t[keep]
+        
+        result[result > max_ticks] = np.inf
+        return result
+
+def time_to_corner_study(speeds, danger_zones, count=1_000_000, max_seconds=600, seed=None):
+    """Монте-Карло времени до угла для каждой пары (скорость, зона угла)"""
+    max_ticks = max_seconds / PHYSICS_DT
+    rows = []
+    for speed in speeds:
+        for zone in danger_zones:
+            times = BatchSimulation(count, speed, zone, seed).run(max_ticks) * PHYSICS_DT
+            finished = times[np.isfinite(times)]
+            rows.append({
+                'speed': speed,
+                'danger_zone': zone,
+                'reached': finished.size / count,
+                'median': float(np.median(finished)) if finished.size else math.inf,
+                'p90': float(np.percentile(finished, 90)) if finished.size else math.inf,
+            })
+    return rows
+
+def main():
+    """Запуск исследования или проверки рекордов из командной строки"""
+    parser = argparse.ArgumentParser(description="Время до угла: Монте-Карло на NumPy")
+    parser.add_argument('--verify', metavar='PLAYER_DATA',
+                        help="Проверить рекорды из player_data.json повтором сессий")
+    parser.add_argument('--count', type=int, default=1_000_000, help="Число квадратов на настройку")
+    parser.add_argument('--max-seconds', type=float, default=600, help="Предел игрового времени")
+    parser.add_argument('--speeds', type=float, nargs='+', default=[INITIAL_SPEED])
+    parser.add_argument('--zones', type=float, nargs='+', default=[CORNER_DANGER_ZONE, 80, 100, 120])
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+    
+    if args.verify:
+        with open(args.verify, 'r', encoding='utf-8') as f:
+            records = json.load(f).get('records', [])
+        results, speedups = verify_records(records)
+        for record, ok, reason in results:
+            status = 'OK' if ok else 'ОШИБКА'
+            print(f"{status:>7} {record.get('name', '?')} {record.get('score', 0):.2f} с - {reason}")
+        for mode, speedup in speedups.items():
+            print(f"Повтор ({mode}) быстрее реального времени в {speedup:.0f} раз")
+        return 0 if all(ok for _, ok, _ in results) else 1
+    
+    rows = time_to_corner_study(args.speeds, args.zones, args.count, args.max_seconds, args.seed)
+    print(f"{'скорость':>9} {'зона':>6} {'дошли':>7} {'медиана, с':>11} {'p90, с':>9}")
+    for row in rows:
+        print(f"{row['speed']:>9.1f} {row['danger_zone']:>6.0f} {row['reached']:>7.1%} "
+              f"{row['median']:>11.1f} {row['p90']:>9.1f}")
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,23 +1,82 @@
+from kivy.config import Config
+from kivy.utils import platform
+
+DEFAULT_REFRESH_RATE = 60  # Гц, если частоту дисплея узнать нельзя
+
+def get_display_refresh_rate():
+    """Частота обновления дисплея (Гц); вне Android - DEFAULT_REFRESH_RATE"""
+    if platform != 'android':
+        return DEFAULT_REFRESH_RATE
+    try:
+        from jnius import autoclass
+        activity = autoclass('org.kivy.android.PythonActivity').mActivity
+        rate = activity.getWindowManager().getDefaultDisplay().getRefreshRate()
+    except Exception as e:  # Ошибка JNI не должна мешать запуску
+        print(f"Частота дисплея недоступна: {e}")
+        return DEFAULT_REFRESH_RATE
+    return round(rate) if rate >= 30 else DEFAULT_REFRESH_RATE
+
+# Кадр на каждый vsync панели (60/90/120 Гц): предел Kivy равен частоте дисплея.
+# С пределом цикл Kivy спит между кадрами - меню и пауза не грузят процессор.
+# Настройка читается при создании Clock - до импорта App
+DISPLAY_REFRESH_RATE = get_display_refresh_rate()
+Config.set('graphics', 'maxfps', str(DISPLAY_REFRESH_RATE))
+Config.set('graphics', 'vsync', '1')
+
 from kivy.app import App
 from kivy.uix.widget import Widget
 from kivy.uix.floatlayout import FloatLayout
-from kivy.graphics import Color, Rectangle, Ellipse, Line, RoundedRectangle
+from kivy.graphics import Color, Rectangle, Line, RoundedRectangle, Mesh, RenderContext
+from kivy.graphics import Fbo, ClearColor, ClearBuffers
+from kivy.graphics import PushMatrix, PopMatrix, Translate, Scale
 from kivy.core.text import Label as CoreLabel
+from kivy.core.image import Image as CoreImage
 from kivy.clock import Clock
 from kivy.core.window import Window
 import math
-import random
-import json
 import os
+from array import array
+from collections import OrderedDict
 from datetime import datetime
 
+from particles import ParticlePool
+from profiler import FrameProfiler
+from storage import PlayerDataStore, GameHistory
+from game_core import (
+    CANVAS_WIDTH, CANVAS_HEIGHT, BOX_SIZE, CORNER_DANGER_ZONE, PHYSICS_DT,
+    CORNERS, GameClock, GameSimulation, MultiBoxSimulation
+)
+
 # Константы (базовые размеры)
-CANVAS_WIDTH = 800
-CANVAS_HEIGHT = 600
-BOX_SIZE = 100
-INITIAL_SPEED = 4.0
-CORNER_DANGER_ZONE = 70
-UPDATE_INTERVAL = 1/60  # 60 FPS
+UPDATE_INTERVAL = 0  # Игровой цикл на каждом кадре окна
+FRAME_BUDGET = 1 / DISPLAY_REFRESH_RATE  # Бюджет кадра профилировщика - период vsync
+MAX_FRAME_TIME = 0.25  # Предел dt за кадр, чтобы не догонять физику бесконечно
+TEXT_CACHE_SIZE = 128  # Максимум текстур текста в кэше
+RESIZE_DEBOUNCE = 0.15  # Раскладка после серии событий изменения размера окна, с
+TOUCH_GRID_CELL = 128  # Сторона ячейки сетки областей касания, px
+
+# Файлы данных
+PLAYER_DATA_FILE = 'player_data.json'
+HISTORY_DB_FILE = os.path.join(os.path.dirname(PLAYER_DATA_FILE), 'game_history.db')
+PROFILE_DUMP_FILE = os.path.join(os.path.dirname(PLAYER_DATA_FILE), 'frame_profile.json')
+LOGO_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'dvd_logo.jpg')
+PROFILE_OVERLAY_INTERVAL = 0.5  # Обновление оверлея профилировщика, с
+
+# Атлас глифов HUD
+HUD_PREFIXES = ('Время: ', 'Рекорд: ')
+HUD_GLYPHS = '0123456789:'
+HUD_MAX_GLYPHS = 8  # Максимум символов в значении (до 99999:59)
+
+# Число настроек ВКЛ/ВЫКЛ на экране настроек
+TOGGLE_ROWS = 4
+
+# Таблица рекордов
+RECORDS_LIMIT = 10
+RECORDS_VIEWS = (
+    ('overall', 'ОБЩИЙ'),
+    ('character', 'ПЕРСОНАЖ'),
+    ('days', 'ПО ДНЯМ'),
+)
 
 # Цвета (в формате 0-1) - только базовые
 COLORS = [
@@ -33,6 +92,19 @@ BORDER_COLOR = (1, 1, 1, 1)
 DANGER_RED = (1, 0, 0, 0.3)
 DANGER_GRAY = (0.5, 0.5, 0.5, 0.2)
 
+# Частицы (логические единицы поля, время - секунды игры)
+TRAIL_LIFETIME = 0.35  # След: одна частица на шаг физики у задней кромки логотипа
+TRAIL_SIZE = 14
+SPARK_COUNT = 24  # Искры отскока от стены
+SPARK_SPEED = 260
+SPARK_LIFETIME = 0.5
+SPARK_SIZE = 6
+NEAR_MISS_DISTANCE = CORNER_DANGER_ZONE * 2  # Отскок рядом с углом - вспышка ярче
+NEAR_MISS_COUNT = 120
+NEAR_MISS_SPEED = 420
+NEAR_MISS_LIFETIME = 0.8
+NEAR_MISS_COLOR = (1, 0.35, 0.2, 1)
+
 # Цвета UI
 AMBER_BG = (254/255, 243/255, 199/255, 1)
 GRAY_DARK = (74/255, 74/255, 74/255, 1)
@@ -40,6 +112,42 @@ WHITE = (1, 1, 1, 1)
 TV_FRAME_COLOR = (0.2, 0.2, 0.2, 1)
 TV_SCREEN_COLOR = (0.15, 0.15, 0.15, 1)
 
+# Тема статичного слоя поля (смена темы - повод перезапечь слой)
+PLAYFIELD_THEME = (TV_FRAME_COLOR, TV_SCREEN_COLOR, BG_CANVAS, LINE_COLOR)
+
+# Динамическая геометрия поля: один Mesh, вершина (x, y, u, v, r, g, b, a);
+# u < 0 - геометрия без текстуры (заливка цветом вершины)
+FIELD_VERTEX_FORMAT = [
+    (b'vPosition', 2, 'float'),
+    (b'vTexCoords0', 2, 'float'),
+    (b'vColor', 4, 'float'),
+]
+FIELD_VERTEX_SIZE = 8
+UNTEXTURED_UV = (-1.0, 0.0)
+CORNER_SEGMENTS = 64  # Сегментов в круге зоны угла
+BOX_BORDER = 3  # Полуширина рамки квадрата (как у Line(width=3))
+
+# Шейдер поля: цвет берется из вершины, а не из инструкции Color.
+# Логотип на белом фоне читается как маска покрытия: фон прозрачен,
+# сам логотип принимает цвет вершины
+FIELD_SHADER_VS = '''$HEADER$
+attribute vec4 vColor;
+
+void main (void) {
+    frag_color = vColor * color * vec4(1.0, 1.0, 1.0, opacity);
+    tex_coord0 = vTexCoords0;
+    gl_Position = projection_mat * modelview_mat * vec4(vPosition.xy, 0.0, 1.0);
+}
+'''
+FIELD_SHADER_FS = '''$HEADER$
+void main (void) {
+    vec4 texel = texture2D(texture0, tex_coord0);
+    float coverage = 1.0 - min(texel.r, min(texel.g, texel.b));
+    float textured = step(0.0, tex_coord0.x);
+    gl_FragColor = frag_color * vec4(1.0, 1.0, 1.0, mix(1.0, coverage, textured));
+}
+'''
+
 # Персонажи (The Office) без смайликов
 CHARACTERS = [
     "Майкл Скотт",
@@ -64,68 +172,575 @@ CHARACTER_COLORS = {
     "Анджела Мартин": (0.5, 0.5, 0.5, 1)    # Серый
 }
 
-def get_scale():
+def get_scale(width, height):
     """Получить коэффициент масштабирования под размер экрана"""
     # Определяем ориентацию
-    is_portrait = Window.height > Window.width
+    is_portrait = height > width
     
     if is_portrait:
         # Портретная ориентация - базовая ширина 1080px (Full HD портрет)
         base_width = 1080
-        scale = Window.width / base_width
+        scale = width / base_width
     else:
         # Ландшафтная ориентация - базовая ширина 1920px (Full HD ландшафт)
         base_width = 1920
-        scale = Window.width / base_width
+        scale = width / base_width
     
     # Ограничиваем масштаб от 0.7 до 1.3
     return max(0.7, min(scale, 1.3))
 
+class LayoutMetrics:
+    """Метрики раскладки для одного размера окна.
+    
+    Масштаб и прямоугольники экранов (x, y, ширина, высота) считаются
+    один раз на размер окна; построители экранов и обработчики касаний
+    читают готовые значения.
+    """
+    
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.scale = get_scale(width, height)
+        dp = self.dp
+        
+        # Общие элементы экранов
+        self.title_y = height - dp(150)
+        self.back_button = (width/2 - dp(340)/2, dp(75), dp(340), dp(85))
+        
+        # Главное меню: рамка телевизора (увеличенные максимальные размеры для Full HD)
+        frame_width = min(width - dp(100), dp(1000))
+        frame_height = min(height - dp(100), dp(900))
+        frame_x = width/2 - frame_width/2
+        frame_y = height/2 - frame_height/2
+        self.menu_frame = (frame_x, frame_y, frame_width, frame_height)
+        self.menu_outer = (frame_x - dp(35), frame_y - dp(35), frame_width + dp(70), frame_height + dp(70))
+        self.menu_title_y = frame_y + dp(560)
+        self.menu_desc_y = frame_y + dp(470)
+        
+        # Информационные блоки (адаптивная ширина) и кнопка старта
+        block_width = (frame_width - dp(80)) / 3
+        self.info_blocks = [
+            (frame_x + dp(40) + (block_width + dp(20)) * i, frame_y + dp(300), block_width, dp(130))
+            for i in range(3)
+        ]
+        self.start_button = (width/2 - dp(400)/2, frame_y + dp(160), dp(400), dp(95))
+        
+        # Выбор персонажа (2 колонки)
+        char_width = dp(340)
+        char_height = dp(85)
+        spacing = dp(22)
+        self.character_buttons = [
+            (width/2 - char_width - spacing/2 + (i % 2) * (char_width + spacing),
+             height - dp(260) - (i // 2) * (char_height + spacing),
+             char_width, char_height)
+            for i in range(len(CHARACTERS))
+        ]
+        
+        # Настройки: центр и высота подписи и кнопки ВКЛ/ВЫКЛ каждой настройки.
+        # Полный шаг строк dp(280) и отступ кнопок от подписи dp(150); если
+        # столбец не помещается над кнопкой назад, настройки идут в два столбца,
+        # когда те помещаются по ширине, а отступы сжимаются
+        btn_width = dp(220)
+        btn_spacing = dp(22)
+        toggle_top = height - dp(300)
+        toggle_space = toggle_top - dp(170)
+        column_step = btn_width * 2 + btn_spacing + dp(60)
+        columns = 1
+        if toggle_space < dp(280) * (TOGGLE_ROWS - 1) + dp(150) and 2 * column_step <= width:
+            columns = 2
+        rows = -(-TOGGLE_ROWS // columns)
+        fit = min(1.0, toggle_space / (dp(280) * max(1, rows - 1) + dp(150)))
+        toggle_gap = max(dp(95), dp(150) * fit)
+        row_step = max(toggle_gap + dp(45),
+                       min(dp(280), (toggle_space - toggle_gap) / max(1, rows - 1)))
+        self.toggle_rows = []
+        for i in range(TOGGLE_ROWS):
+            center_x = width/2 + (i % columns - (columns - 1) / 2) * column_step
+            label_y = toggle_top - (i // columns) * row_step
+            btn_y = label_y - toggle_gap
+            self.toggle_rows.append((
+                center_x,
+                label_y,
+                (center_x - btn_width - btn_spacing/2, btn_y, btn_width, dp(85)),
+                (center_x + btn_spacing/2, btn_y, btn_width, dp(85))
+            ))
+        
+        # Таблица рекордов: вкладки и строки до кнопки назад
+        tab_width = dp(250)
+        tab_spacing = dp(18)
+        tabs_width = len(RECORDS_VIEWS) * tab_width + (len(RECORDS_VIEWS) - 1) * tab_spacing
+        self.records_tabs = [
+            (width/2 - tabs_width/2 + i * (tab_width + tab_spacing), height - dp(235), tab_width, dp(70))
+            for i in range(len(RECORDS_VIEWS))
+        ]
+        rows_top = height - dp(320)
+        self.record_row_height = dp(65)
+        max_rows = max(1, int((rows_top - dp(170)) // self.record_row_height) + 1)
+        self.record_rows = [
+            (dp(55), rows_top - i * self.record_row_height, width - dp(110), self.record_row_height - dp(10))
+            for i in range(min(max_rows, RECORDS_LIMIT))
+        ]
+        self.record_text_x = dp(75)
+        
+        # Игра: HUD, поле между HUD и кнопками, кнопки паузы и выхода
+        self.hud_margin = dp(45)
+        self.hud_y = height - dp(95)
+        self.field_border = dp(45) + dp(35)  # Отступ экрана телевизора и его рамка
+        self.field = self.fit_field(height - dp(110), dp(155))
+        self.pause_button = (width/2 - dp(220) - dp(18), dp(55), dp(220), dp(85))
+        self.exit_button = (width/2 + dp(18), dp(55), dp(220), dp(85))
+        
+        # Game Over
+        self.gameover_title_y = height - dp(230)
+        self.gameover_score_y = height - dp(330)
+        self.gameover_best_y = height - dp(400)
+        self.restart_button = (width/2 - dp(400)/2, dp(250), dp(400), dp(95))
+        self.menu_button = (width/2 - dp(400)/2, dp(145), dp(400), dp(85))
+    
+    def dp(self, size):
+        """Масштабируемые пиксели для размеров элементов"""
+        return int(size * self.scale)
+    
+    def fit_field(self, top, bottom):
+        """Поле 800x600 вписанное между top и bottom: (x, y, ширина, высота)"""
+        border = self.field_border
+        scale = min((self.width - border * 2) / CANVAS_WIDTH,
+                    (top - bottom - border * 2) / CANVAS_HEIGHT)
+        
+        # Ширина кратна 4, чтобы поле 4:3 легло на целые пиксели
+        field_width = max(4, int(CANVAS_WIDTH * scale) // 4 * 4)
+        field_height = field_width * CANVAS_HEIGHT // CANVAS_WIDTH
+        field_x = int(self.width/2 - field_width/2)
+        field_y = int((top + bottom)/2 - field_height/2)
+        return field_x, field_y, field_width, field_height
+
+# Метрики текущего размера окна (сбрасываются при изменении размера)
+layout_metrics = None
+
+def get_metrics():
+    """Метрики раскладки для текущего размера окна"""
+    global layout_metrics
+    if layout_metrics is None:
+        layout_metrics = LayoutMetrics(*Window.size)
+    return layout_metrics
+
+def invalidate_metrics(*args):
+    """Сброс метрик: следующий вызов пересчитает их под новый размер окна"""
+    global layout_metrics
+    layout_metrics = None
+
+Window.bind(on_resize=invalidate_metrics)
+
 def sp(size):
     """Масштабируемые пиксели для размеров шрифта"""
-    return int(size * get_scale())
+    return int(size * get_metrics().scale)
 
 def dp(size):
     """Масштабируемые пиксели для размеров элементов"""
-    return int(size * get_scale())
+    return int(size * get_metrics().scale)
+
+# Профилировщик кадра (включается в настройках)
+frame_profiler = FrameProfiler(FRAME_BUDGET)
+
+class TextTextureCache:
+    """LRU-кэш текстур текста (CoreLabel растеризуется один раз на строку)"""
+    
+    def __init__(self, max_size=TEXT_CACHE_SIZE):
+        self.max_size = max_size
+        self.textures = OrderedDict()
+        
+        # Счетчики попаданий и промахов
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, text, font_size, bold=False, halign='left'):
+        """Получить текстуру текста, растеризуя только при промахе"""
+        key = (text, font_size, bold, halign)
+        texture = self.textures.get(key)
+        if texture is not None:
+            self.hits += 1
+            self.textures.move_to_end(key)
+            return texture
+        
+        self.misses += 1
+        if frame_profiler.enabled:
+            start = frame_profiler.now()
+        label = CoreLabel(text=text, font_size=font_size, bold=bold, halign=halign)
+        label.refresh()
+        texture = label.texture
+        if frame_profiler.enabled:
+            frame_profiler.record('text', start)
+        
+        self.textures[key] = texture
+        if len(self.textures) > self.max_size:
+            # Вытесняем самую давно использованную текстуру
+            self.textures.popitem(last=False)
+        return texture
+    
+    def clear(self):
+        """Очистка кэша и счетчиков"""
+        self.textures.clear()
+        self.hits = 0
+        self.misses = 0
+
+# Общий кэш текстур текста
+text_cache = TextTextureCache()
+
+def get_text_texture(text, font_size, bold=False, halign='left'):
+    """Текстура текста из общего кэша"""
+    return text_cache.get(text, font_size, bold, halign)
+
+# Текстура логотипа (загружается один раз)
+logo_texture = None
+
+def get_logo_texture():
+    """Текстура dvd_logo.jpg с мипмапами для уменьшенного вывода"""
+    global logo_texture
+    if logo_texture is None:
+        logo_texture = CoreImage(LOGO_FILE, mipmap=True).texture
+    return logo_texture
+
+class GlyphAtlas:
+    """Атлас глифов HUD: префиксы и цифры растеризуются одной текстурой"""
+    
+    def __init__(self, font_size, bold=True):
+        self.font_size = font_size
+        pieces = list(HUD_PREFIXES) + list(HUD_GLYPHS)
+        
+        if frame_profiler.enabled:
+            start = frame_profiler.now()
+        label = CoreLabel(text=''.join(pieces), font_size=font_size, bold=bold)
+        label.refresh()
+        if frame_profiler.enabled:
+            frame_profiler.record('text', start)
+        self.texture = label.texture
+        self.height = self.texture.height
+        
+        # Регионы атласа по накопленной ширине строки
+        self.regions = {}
+        x = 0
+        for piece in pieces:
+            width = label.get_extents(piece)[0]
+            self.regions[piece] = self.texture.get_region(x, 0, width, self.height)
+            x += width
+
+# Атласы по размеру шрифта (пересобираются только при смене размера)
+glyph_atlases = {}
+
+def get_glyph_atlas(font_size):
+    """Атлас глифов HUD для размера шрифта"""
+    atlas = glyph_atlases.get(font_size)
+    if atlas is None:
+        atlas = GlyphAtlas(font_size)
+        glyph_atlases[font_size] = atlas
+    return atlas
+
+class AtlasText:
+    """Строка HUD из регионов атласа: обновление меняет только текстурные координаты"""
+    
+    def __init__(self, atlas, prefix, max_glyphs=HUD_MAX_GLYPHS):
+        self.atlas = atlas
+        self.value = None
+        self.width = 0
+        self.x = 0
+        self.y = 0
+        
+        # Инструкции создаются в текущем контексте canvas
+        self.prefix = prefix
+        prefix_region = atlas.regions[prefix]
+        self.prefix_rect = Rectangle(texture=prefix_region, size=prefix_region.size)
+        self.glyph_rects = [Rectangle(size=(0, 0)) for _ in range(max_glyphs)]
+    
+    def set_value(self, value):
+        """Смена значения без растеризации текста"""
+        if value == self.value:
+            return
+        self.value = value
+        
+        x = self.x + self.prefix_rect.size[0]
+        for i, rect in enumerate(self.glyph_rects):
+            if i < len(value):
+                region = self.atlas.regions[value[i]]
+                rect.texture = region
+                rect.pos = (x, self.y)
+                rect.size = region.size
+                x += region.width
+            else:
+                rect.size = (0, 0)
+        self.width = x - self.x
+    
+    def set_atlas(self, atlas):
+        """Смена атласа (другой размер шрифта после изменения окна)"""
+        if atlas is self.atlas:
+            return
+        self.atlas = atlas
+        prefix_region = atlas.regions[self.prefix]
+        self.prefix_rect.texture = prefix_region
+        self.prefix_rect.size = prefix_region.size
+        self.set_pos(self.x, self.y)
+    
+    def set_pos(self, x, y):
+        """Перенос строки целиком"""
+        self.x = x
+        self.y = y
+        self.prefix_rect.pos = (x, y)
+        value = self.value
+        self.value = None
+        self.set_value(value or '')
+
+def place_text(rect, texture, x, y):
+    """Текстура текста в прямоугольник инструкции с левым нижним углом (x, y)"""
+    rect.texture = texture
+    rect.size = texture.size
+    rect.pos = (x, y)
+
+class TouchRegions:
+    """Интерактивные области экрана в равномерной сетке.
+    
+    Касание проверяется только по областям своей ячейки. Сетка
+    строится по метрикам окна и перестраивается при их смене.
+    """
+    
+    def __init__(self, cell_size=TOUCH_GRID_CELL):
+        self.cell_size = cell_size
+        self.regions = []  # (rect(), on_press)
+        self.rects = []
+        self.cells = {}
+        self.metrics = None
+    
+    def add(self, rect, on_press):
+        """Область rect() -> (x, y, ширина, высота) с обработчиком нажатия"""
+        self.regions.append((rect, on_press))
+        self.metrics = None
+    
+    def rebuild(self):
+        """Раскладка областей по ячейкам под текущие метрики"""
+        cell = self.cell_size
+        self.rects = [rect() for rect, on_press in self.regions]
+        self.cells = {}
+        for index, (x, y, width, height) in enumerate(self.rects):
+            for cell_x in range(int(x // cell), int((x + width) // cell) + 1):
+                for cell_y in range(int(y // cell), int((y + height) // cell) + 1):
+                    self.cells.setdefault((cell_x, cell_y), []).append(index)
+        self.metrics = get_metrics()
+    
+    def find(self, x, y):
+        """Обработчик области под точкой (x, y) или None"""
+        if self.metrics is not get_metrics():
+            self.rebuild()
+        cell = self.cell_size
+        # Позже добавленная область лежит выше
+        for index in reversed(self.cells.get((int(x // cell), int(y // cell)), ())):
+            rect_x, rect_y, width, height = self.rects[index]
+            if rect_x <= x <= rect_x + width and rect_y <= y <= rect_y + height:
+                return self.regions[index][1]
+        return None
+
+class ScreenWidget(FloatLayout):
+    """Экран: инструкции создаются один раз, позиции пересчитываются на месте"""
+    
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.layouts = []
+        self.layout_size = None
+        self.touch_regions = TouchRegions()
+    
+    def add_layout(self, layout):
+        """Функция раскладки: вызывается сразу и при каждом изменении окна"""
+        self.layouts.append(layout)
+        layout()
+        self.layout_size = tuple(Window.size)
+    
+    def relayout(self):
+        """Пересчет позиций всех инструкций экрана под текущий размер окна"""
+        for layout in self.layouts:
+            layout()
+        # Вложенные слои экрана (кнопки поверх игры) раскладываются вместе с ним
+        for child in self.children:
+            if isinstance(child, ScreenWidget):
+                child.relayout()
+        self.layout_size = tuple(Window.size)
+    
+    def add_region(self, rect, on_press):
+        """Нажимаемая область экрана; rect() -> прямоугольник из метрик"""
+        self.touch_regions.add(rect, on_press)
+    
+    def on_touch_down(self, touch):
+        """Одно касание - один поиск по сетке областей, затем дочерние виджеты"""
+        on_press = self.touch_regions.find(*touch.pos)
+        if on_press is not None:
+            on_press()
+            return True
+        return super().on_touch_down(touch)
+
+class FieldBatch:
+    """Динамическая геометрия поля в одном Mesh с цветом в каждой вершине.
+    
+    Вершины лежат в заранее выделенном array('f') и переписываются на месте
+    (пачка четырехугольников - срезами с шагом), Mesh получает тот же буфер.
+    Состав задается до build(), поэтому индексы треугольников строятся
+    один раз, а порядок добавления - порядок отрисовки.
+    """
+    
+    def __init__(self):
+        self.vertices = array('f')
+        self.indices = []
+        self.mesh = None
+    
+    def vertex_count(self):
+        """Число вершин в буфере"""
+        return len(self.vertices) // FIELD_VERTEX_SIZE
+    
+    def add_quads(self, count, tex_coords=None):
+        """Место под count четырехугольников; возвращает первую вершину
+        
+        tex_coords - координаты текстуры Mesh для вершин квадрата, без них заливка.
+        """
+        start = self.vertex_count()
+        tex_coords = tex_coords or UNTEXTURED_UV * 4
+        quad = array('f')
+        for corner in range(4):
+            quad.extend((0, 0) + tuple(tex_coords[corner * 2:corner * 2 + 2]) + (1, 1, 1, 1))
+        for i in range(count):
+            first = start + i * 4
+            self.vertices.extend(quad)
+            self.indices.extend((first, first + 1, first + 2, first, first + 2, first + 3))
+        return start
+    
+    def add_circle(self, x, y, radius, segments=CORNER_SEGMENTS):
+        """Круг веером треугольников (позиции постоянны); возвращает первую вершину"""
+        start = self.vertex_count()
+        self.vertices.extend((x, y) + UNTEXTURED_UV + (1, 1, 1, 1))
+        for i in range(segments + 1):
+            angle = 2 * math.pi * i / segments
+            self.vertices.extend((x + math.cos(angle) * radius, y + math.sin(angle) * radius)
+                                 + UNTEXTURED_UV + (1, 1, 1, 1))
+        for i in range(segments):
+            self.indices.extend((start, start + 1 + i, start + 2 + i))
+        return start
+    
+    def build(self, texture=None):
+        """Mesh на весь буфер (вызывается внутри контекста отрисовки)"""
+        self.mesh = Mesh(fmt=FIELD_VERTEX_FORMAT, mode='triangles', texture=texture,
+                         vertices=self.vertices, indices=self.indices)
+    
+    def set_color(self, start, count, rgba):
+        """Один цвет для count вершин начиная со start"""
+        vertices = self.vertices
+        color = array('f', rgba)
+        for offset in range(start * FIELD_VERTEX_SIZE + 4, (start + count) * FIELD_VERTEX_SIZE,
+                            FIELD_VERTEX_SIZE):
+            vertices[offset:offset + 4] = color
+    
+    def set_quad(self, start, x, y, width, height):
+        """Позиция одного четырехугольника"""
+        offset = start * FIELD_VERTEX_SIZE
+        end = offset + 4 * FIELD_VERTEX_SIZE
+        self.vertices[offset:end:FIELD_VERTEX_SIZE] = array('f', (x, x + width, x + width, x))
+        self.vertices[offset + 1:end:FIELD_VERTEX_SIZE] = array('f', (y, y, y + height, y + height))
+    
+    def set_quads(self, start, xs, ys, size):
+        """Позиции пачки квадратов со стороной size по массивам xs, ys"""
+        self.set_quad_rects(start, array('f', xs), array('f', ys),
+                            array('f', [x + size for x in xs]), array('f', [y + size for y in ys]))
+    
+    def set_quad_rects(self, start, lefts, bottoms, rights, tops):
+        """Позиции пачки прямоугольников по массивам их краев"""
+        count = len(lefts)
+        self.set_quad_columns(start, count, 0, (lefts, rights, rights, lefts))
+        self.set_quad_columns(start, count, 1, (bottoms, bottoms, tops, tops))
+    
+    def hide_quads(self, start, count):
+        """Схлопывание пачки четырехугольников в точку (не рисуются)"""
+        zeros = array('f', bytes(4 * count))
+        self.set_quad_columns(start, count, 0, (zeros,) * 4)
+        self.set_quad_columns(start, count, 1, (zeros,) * 4)
+    
+    def set_quad_colors(self, start, channels):
+        """Цвета пачки четырехугольников: channels - массивы r, g, b, a по одному на квадрат"""
+        count = len(channels[0])
+        for channel, values in enumerate(channels):
+            self.set_quad_columns(start, count, 4 + channel, (values,) * 4)
+    
+    def set_quad_columns(self, start, count, component, corners):
+        """Компонента вершины для каждой из четырех вершин пачки: одна запись среза с шагом"""
+        stride = 4 * FIELD_VERTEX_SIZE
+        base = start * FIELD_VERTEX_SIZE + component
+        end = (start + count * 4) * FIELD_VERTEX_SIZE
+        for corner, values in enumerate(corners):
+            self.vertices[base + corner * FIELD_VERTEX_SIZE:end:stride] = values
+    
+    def update(self):
+        """Буфер изменен - Mesh перезагружает его перед отрисовкой"""
+        self.mesh.vertices = self.vertices
 
 class GameView(Widget):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         
-        # Состояние квадрата
-        self.box_x = (CANVAS_WIDTH - BOX_SIZE) / 2.0
-        self.box_y = (CANVAS_HEIGHT - BOX_SIZE) / 2.0
-        self.velocity_x = INITIAL_SPEED
-        self.velocity_y = INITIAL_SPEED
-        self.box_color_index = 0
+        # Состояние квадрата и физика (без Kivy)
+        self.sim = GameSimulation(len(COLORS))
         
         # Игровое состояние
         self.playing = False
         self.paused = False
-        self.start_time = 0
+        self.clock = GameClock()
         self.current_score = 0
         
         # Game loop
         self.game_loop_event = None
+        self.accumulator = 0.0
+        self.immediate_input = False  # Шаг физики и отрисовка сразу после попадания
+        self.multi_logo = False  # Сложный режим с роем логотипов
+        
+        # Инструкции сцены (строятся один раз в start): геометрия поля
+        # в одном Mesh, первые вершины частей сцены в его буфере
+        self.scene_built = False
+        self.field_context = None
+        self.batch = None
+        self.corner_vertices = []
+        self.corner_danger = []
+        self.swarm_vertices = None
+        self.drawn_swarm_colors = None
+        self.box_vertices = None
+        self.border_vertices = None
+        
+        # Искры и след: пул частиц и его место в буфере поля
+        self.particles = ParticlePool()
+        self.particle_vertices = None
+        self.drawn_particles = 0
+        
+        # Состояние до последнего шага физики: кадр рисуется между ним и текущим
+        self.prev_box_x = 0.0
+        self.prev_box_y = 0.0
+        self.prev_swarm_xs = None
+        self.prev_swarm_ys = None
+        
+        # Поле рисуется в логических единицах через одну матрицу сдвига и масштаба
+        self.field_translate = None
+        self.field_scale = None
+        self.drawn_color_index = None
+        
+        self.bind(pos=self.layout_scene, size=self.layout_scene)
         
     def start(self):
         """Старт игры"""
         self.playing = True
         self.paused = False
-        self.start_time = datetime.now()
+        self.clock.start()
         self.current_score = 0
+        self.accumulator = 0.0
         
-        # Случайное направление
-        angle = random.uniform(0, 2 * math.pi)
-        self.velocity_x = math.cos(angle) * INITIAL_SPEED
-        self.velocity_y = math.sin(angle) * INITIAL_SPEED
-        
-        # Центр экрана
-        self.box_x = (CANVAS_WIDTH - BOX_SIZE) / 2.0
-        self.box_y = (CANVAS_HEIGHT - BOX_SIZE) / 2.0
+        # Новое зерно сессии: направление и цвет из центра поля
+        simulation = MultiBoxSimulation if self.multi_logo else GameSimulation
+        if type(self.sim) is not simulation:
+            self.sim = simulation(len(COLORS))
+        self.sim.start()
+        self.particles.clear()
+        self.keep_previous_state()
         
-        self.box_color_index = random.randint(0, len(COLORS) - 1)
+        # Построение сцены
+        self.build_scene()
         
         # Запуск game loop
         self.game_loop_event = Clock.schedule_interval(self.update_game, UPDATE_INTERVAL)
@@ -133,23 +748,43 @@ class GameView(Widget):
         self.render()
     
     def pause(self):
-        """Пауза"""
+        """Пауза: игровой цикл снимается с Clock до продолжения"""
+        if not self.playing:
+            return
+        
         self.paused = not self.paused
+        frame_profiler.pause()
+        
+        if self.paused:
+            self.clock.pause()
+            if self.game_loop_event:
+                self.game_loop_event.cancel()
+            # Последний кадр остается на экране без перерисовок
+            self.render()
+        else:
+            # Время паузы не входит в счет, физика продолжает с того же места
+            self.clock.resume()
+            if self.game_loop_event:
+                self.game_loop_event()
     
     def stop(self):
         """Стоп игры"""
         self.playing = False
         self.paused = False
+        self.clock.pause()
         if self.game_loop_event:
             self.game_loop_event.cancel()
             self.game_loop_event = None
     
     def get_score(self):
-        """Получить текущий счет (секунды)"""
+        """Получить текущий счет (секунды игрового времени по тикам физики)"""
         if not self.playing:
             return self.current_score
-        elapsed = (datetime.now() - self.start_time).total_seconds()
-        return elapsed
+        return self.sim.score()
+    
+    def set_time_scale(self, time_scale):
+        """Замедление (< 1) или ускорение (> 1) игрового времени"""
+        self.clock.set_time_scale(time_scale)
     
     def is_running(self):
         """Проверка, идет ли игра"""
@@ -157,144 +792,285 @@ class GameView(Widget):
     
     def check_corner_collision(self):
         """Проверка столкновения с углами"""
-        box_center_x = self.box_x + BOX_SIZE / 2.0
-        box_center_y = self.box_y + BOX_SIZE / 2.0
-        
-        corners = [
-            (0, 0),
-            (CANVAS_WIDTH, 0),
-            (0, CANVAS_HEIGHT),
-            (CANVAS_WIDTH, CANVAS_HEIGHT)
-        ]
-        
-        for corner_x, corner_y in corners:
-            distance = math.sqrt(
-                (box_center_x - corner_x) ** 2 + 
-                (box_center_y - corner_y) ** 2
-            )
-            if distance < CORNER_DANGER_ZONE:
-                return True
-        
-        return False
+        return self.sim.check_corner_collision()
+    
+    def step_physics(self):
+        """Один фиксированный шаг физики. Возвращает True при попадании в угол"""
+        sim = self.sim
+        bounces = sim.bounces
+        self.keep_previous_state()
+        hit = sim.step()
+        if sim.bounces != bounces:
+            self.emit_bounce()
+        self.emit_trail()
+        return hit
+    
+    def keep_previous_state(self):
+        """Запоминание позиций перед шагом физики (для интерполяции кадра)"""
+        sim = self.sim
+        self.prev_box_x = sim.box_x
+        self.prev_box_y = sim.box_y
+        if isinstance(sim, MultiBoxSimulation):
+            if self.prev_swarm_xs is None or len(self.prev_swarm_xs) != len(sim.xs):
+                self.prev_swarm_xs = array('d', sim.xs)
+                self.prev_swarm_ys = array('d', sim.ys)
+            else:
+                self.prev_swarm_xs[:] = sim.xs
+                self.prev_swarm_ys[:] = sim.ys
+    
+    def emit_bounce(self):
+        """Искры в точке удара о стену, у самого угла - вспышка ярче"""
+        engine = self.sim.engine
+        center_x = engine.x0 + BOX_SIZE / 2
+        center_y = engine.y0 + BOX_SIZE / 2
+        
+        # Точка касания и направление от стены внутрь поля
+        x, y = center_x, center_y
+        normal_x = normal_y = 0.0
+        if engine.x0 <= 0:
+            x, normal_x = 0.0, 1.0
+        elif engine.x0 >= CANVAS_WIDTH - BOX_SIZE:
+            x, normal_x = CANVAS_WIDTH, -1.0
+        if engine.y0 <= 0:
+            y, normal_y = 0.0, 1.0
+        elif engine.y0 >= CANVAS_HEIGHT - BOX_SIZE:
+            y, normal_y = CANVAS_HEIGHT, -1.0
+        angle = math.atan2(normal_y, normal_x)
+        
+        near_miss = any(math.hypot(center_x - corner_x, center_y - corner_y) < NEAR_MISS_DISTANCE
+                        for corner_x, corner_y in CORNERS)
+        if near_miss:
+            self.particles.burst(x, y, NEAR_MISS_COUNT, NEAR_MISS_SPEED, NEAR_MISS_LIFETIME,
+                                 SPARK_SIZE, NEAR_MISS_COLOR, angle, math.pi)
+        else:
+            self.particles.burst(x, y, SPARK_COUNT, SPARK_SPEED, SPARK_LIFETIME,
+                                 SPARK_SIZE, COLORS[self.sim.box_color_index], angle, math.pi)
+    
+    def emit_trail(self):
+        """Частица следа у задней кромки логотипа"""
+        sim = self.sim
+        speed = math.hypot(sim.velocity_x, sim.velocity_y) or 1.0
+        back = BOX_SIZE / 2 - TRAIL_SIZE
+        self.particles.spawn(sim.box_x + BOX_SIZE / 2 - sim.velocity_x / speed * back,
+                             sim.box_y + BOX_SIZE / 2 - sim.velocity_y / speed * back,
+                             0.0, 0.0, TRAIL_LIFETIME, TRAIL_SIZE, COLORS[sim.box_color_index])
     
     def update_game(self, dt):
         """Обновление состояния игры"""
         if not self.playing:
             return
         
+        profiling = frame_profiler.enabled
+        if profiling:
+            frame_start = frame_profiler.now()
+            frame_profiler.frame_started(frame_start)
+        
         if not self.paused:
-            # Движение квадрата
-            self.box_x += self.velocity_x
-            self.box_y += self.velocity_y
-            
-            color_changed = False
-            
-            # Отскок от стен
-            if self.box_x <= 0 or self.box_x + BOX_SIZE >= CANVAS_WIDTH:
-                self.velocity_x *= -1
-                self.box_x = max(0, min(self.box_x, CANVAS_WIDTH - BOX_SIZE))
-                self.box_color_index = random.randint(0, len(COLORS) - 1)
-                color_changed = True
-            
-            if self.box_y <= 0 or self.box_y + BOX_SIZE >= CANVAS_HEIGHT:
-                self.velocity_y *= -1
-                self.box_y = max(0, min(self.box_y, CANVAS_HEIGHT - BOX_SIZE))
-                if not color_changed:
-                    self.box_color_index = random.randint(0, len(COLORS) - 1)
-            
-            # Проверка столкновения с углами
-            if self.check_corner_collision():
-                self.current_score = self.get_score()
-                self.stop()
-                App.get_running_app().game_over(self.current_score)
+            if self.advance_physics():
                 return
+            # Частицы живут по игровому времени кадра, а не шагами физики
+            self.particles.update(min(dt, MAX_FRAME_TIME) * self.clock.time_scale)
+            if profiling:
+                frame_profiler.record('physics', frame_start)
         
         # Обновить счет
+        if profiling:
+            phase_start = frame_profiler.now()
         score = self.get_score()
         App.get_running_app().update_score(score)
+        if profiling:
+            frame_profiler.record('hud', phase_start)
         
         # Отрисовка
+        if profiling:
+            phase_start = frame_profiler.now()
         self.render()
+        if profiling:
+            frame_profiler.record('render', phase_start)
+            frame_profiler.record('frame', frame_start)
     
-    def render(self):
-        """Отрисовка игры"""
-        if not self.playing and self.current_score == 0:
-            return
+    def advance_physics(self):
+        """Физика до текущего игрового времени. Возвращает True, если игра окончена"""
+        # Накопитель игрового времени: физика идет фиксированными шагами
+        # независимо от частоты вызовов Clock
+        self.accumulator += min(self.clock.tick(), MAX_FRAME_TIME * self.clock.time_scale)
+        while self.accumulator >= PHYSICS_DT:
+            self.accumulator -= PHYSICS_DT
+            if self.step_physics():
+                self.current_score = self.get_score()
+                self.stop()
+                App.get_running_app().game_over(self.current_score)
+                return True
+        return False
+    
+    def apply_input_now(self):
+        """Физика и отрисовка сразу после нажатия, не дожидаясь кадра Clock
         
+        Кадр рисуется по новому отрезку траектории (см. render), поэтому
+        поворот виден уже в нем, даже если шаг физики еще не наступил.
+        """
+        if self.advance_physics():
+            return
+        self.render()
+    
+    def build_scene(self):
+        """Построение инструкций сцены (один раз за игру)"""
         self.canvas.clear()
         
+        # Состав буфера в порядке отрисовки: зоны углов, рой, частицы, квадрат, рамка
+        batch = FieldBatch()
+        self.corner_vertices = [batch.add_circle(corner_x, corner_y, CORNER_DANGER_ZONE)
+                                for corner_x, corner_y in CORNERS]
+        self.corner_danger = [False] * len(CORNERS)
+        for start in self.corner_vertices:
+            batch.set_color(start, CORNER_SEGMENTS + 2, DANGER_GRAY)
+        
+        # Рой и игрок - один логотип dvd_logo.jpg, окрашенный цветом вершин
+        logo = get_logo_texture()
+        self.swarm_vertices = None
+        if isinstance(self.sim, MultiBoxSimulation):
+            self.swarm_vertices = batch.add_quads(self.sim.count, logo.tex_coords)
+            self.drawn_swarm_colors = array('B', self.sim.colors)
+            batch.set_quad_colors(self.swarm_vertices, [
+                array('f', [COLORS[color][channel] for color in self.sim.colors]) for channel in range(4)
+            ])
+        
+        self.particle_vertices = batch.add_quads(self.particles.capacity)
+        self.drawn_particles = 0
+        
+        # Логотип: смена цвета при отскоке - только цвет четырех вершин
+        self.box_vertices = batch.add_quads(1, logo.tex_coords)
+        batch.set_color(self.box_vertices, 4, COLORS[self.sim.box_color_index])
+        self.drawn_color_index = self.sim.box_color_index
+        
+        self.border_vertices = batch.add_quads(4)
+        batch.set_color(self.border_vertices, 16, BORDER_COLOR)
+        
+        # Фон и линии текстуры запечены в статичный слой (bake_playfield_layer)
         with self.canvas:
-            # Фон canvas
-            Color(*BG_CANVAS)
-            Rectangle(pos=self.pos, size=self.size)
-            
-            # Линии текстуры
-            Color(*LINE_COLOR)
-            for i in range(0, int(CANVAS_HEIGHT), 30):
-                Line(points=[self.pos[0], self.pos[1] + i, 
-                           self.pos[0] + CANVAS_WIDTH, self.pos[1] + i], width=1)
-            
-            # Углы опасности
-            box_center_x = self.box_x + BOX_SIZE / 2.0
-            box_center_y = self.box_y + BOX_SIZE / 2.0
+            PushMatrix()
+            self.field_translate = Translate()
+            self.field_scale = Scale()
             
-            corners = [
-                (0, 0),
-                (CANVAS_WIDTH, 0),
-                (0, CANVAS_HEIGHT),
-                (CANVAS_WIDTH, CANVAS_HEIGHT)
-            ]
+            # Свой контекст с шейдером цвета вершин под той же матрицей поля
+            self.field_context = RenderContext(use_parent_projection=True,
+                                               use_parent_modelview=True)
             
-            for corner_x, corner_y in corners:
-                distance = math.sqrt(
-                    (box_center_x - corner_x) ** 2 + 
-                    (box_center_y - corner_y) ** 2
-                )
-                is_dangerous = distance < CORNER_DANGER_ZONE
-                
-                if is_dangerous:
-                    Color(*DANGER_RED)
-                else:
-                    Color(*DANGER_GRAY)
-                
-                Ellipse(
-                    pos=(self.pos[0] + corner_x - CORNER_DANGER_ZONE,
-                         self.pos[1] + corner_y - CORNER_DANGER_ZONE),
-                    size=(CORNER_DANGER_ZONE * 2, CORNER_DANGER_ZONE * 2)
-                )
-            
-            # DVD квадрат
-            Color(*COLORS[self.box_color_index])
-            Rectangle(
-                pos=(self.pos[0] + self.box_x, self.pos[1] + self.box_y),
-                size=(BOX_SIZE, BOX_SIZE)
-            )
-            
-            # Рамка квадрата
-            Color(*BORDER_COLOR)
-            Line(
-                rectangle=(self.pos[0] + self.box_x, self.pos[1] + self.box_y,
-                          BOX_SIZE, BOX_SIZE),
-                width=3
-            )
+            PopMatrix()
+        
+        self.field_context.shader.vs = FIELD_SHADER_VS
+        self.field_context.shader.fs = FIELD_SHADER_FS
+        with self.field_context:
+            batch.build(logo)
+        self.batch = batch
         
-        # Текст DVD внутри квадрата
-        self.draw_text_on_box()
+        self.scene_built = True
+        self.layout_scene()
     
-    def draw_text_on_box(self):
-        """Отрисовка текста DVD на квадрате"""
-        label = CoreLabel(text='DVD', font_size=48, bold=True)
-        label.refresh()
-        texture = label.texture
+    def layout_scene(self, *args):
+        """Смена pos/size меняет только матрицу поля, примитивы не трогаются"""
+        if not self.scene_built:
+            return
         
-        with self.canvas:
-            Color(1, 1, 1, 1)
-            Rectangle(
-                texture=texture,
-                pos=(self.pos[0] + self.box_x + BOX_SIZE/2 - texture.width/2,
-                     self.pos[1] + self.box_y + BOX_SIZE/2 - texture.height/2),
-                size=texture.size
-            )
+        scale = self.width / CANVAS_WIDTH
+        self.field_translate.xy = self.pos
+        self.field_scale.xyz = (scale, scale, 1)
+    
+    def window_to_field(self, x, y):
+        """Координаты окна -> логические координаты поля (обратная матрица)"""
+        scale = self.width / CANVAS_WIDTH
+        return (x - self.x) / scale, (y - self.y) / scale
+    
+    def render(self):
+        """Отрисовка игры (обновление позиций и цветов готовой сцены)"""
+        if not self.playing and self.current_score == 0:
+            return
+        if not self.scene_built:
+            return
+        
+        # Углы опасности - меняем цвет вершин только при смене состояния
+        sim = self.sim
+        batch = self.batch
+        danger_index = sim.danger_corner()
+        for i in range(len(CORNERS)):
+            is_dangerous = i == danger_index
+            if is_dangerous != self.corner_danger[i]:
+                self.corner_danger[i] = is_dangerous
+                batch.set_color(self.corner_vertices[i], CORNER_SEGMENTS + 2,
+                                DANGER_RED if is_dangerous else DANGER_GRAY)
+        
+        # Цвет квадрата
+        if self.drawn_color_index != sim.box_color_index:
+            self.drawn_color_index = sim.box_color_index
+            batch.set_color(self.box_vertices, 4, COLORS[sim.box_color_index])
+        
+        # Кадр между двумя последними шагами физики: доля шага, накопленная
+        # с последнего шага. Физика и ее детерминизм от частоты кадров не зависят
+        alpha = min(1.0, self.accumulator / PHYSICS_DT)
+        drawn_time = sim.tick - 1 + alpha
+        
+        # DVD квадрат и рамка (в логических координатах поля)
+        if self.immediate_input:
+            # Мгновенный ввод: текущее игровое время на отрезке движка, без отставания
+            # интерполяции на шаг - поворот после нажатия виден в ближайшем кадре
+            drawn_time = sim.tick + alpha
+            box_x, box_y = sim.engine.reflected_position_at(drawn_time)
+        else:
+            box_x = self.prev_box_x + (sim.box_x - self.prev_box_x) * alpha
+            box_y = self.prev_box_y + (sim.box_y - self.prev_box_y) * alpha
+        batch.set_quad(self.box_vertices, box_x, box_y, BOX_SIZE, BOX_SIZE)
+        self.place_border(box_x, box_y)
+        
+        if self.swarm_vertices is not None:
+            self.render_swarm(alpha)
+        self.render_particles()
+        batch.update()
+        
+        # Нажатия, чей поворот уже вошел в эту сцену, ждут показа кадра
+        if frame_profiler.pending_inputs:
+            frame_profiler.input_drawn(drawn_time)
+    
+    def place_border(self, x, y):
+        """Рамка квадрата - четыре полосы шириной 2 * BOX_BORDER по его краям"""
+        batch = self.batch
+        start = self.border_vertices
+        width = BOX_SIZE + BOX_BORDER * 2
+        batch.set_quad(start, x - BOX_BORDER, y - BOX_BORDER, width, BOX_BORDER * 2)
+        batch.set_quad(start + 4, x - BOX_BORDER, y + BOX_SIZE - BOX_BORDER, width, BOX_BORDER * 2)
+        batch.set_quad(start + 8, x - BOX_BORDER, y + BOX_BORDER, BOX_BORDER * 2, BOX_SIZE - BOX_BORDER * 2)
+        batch.set_quad(start + 12, x + BOX_SIZE - BOX_BORDER, y + BOX_BORDER,
+                       BOX_BORDER * 2, BOX_SIZE - BOX_BORDER * 2)
+    
+    def render_particles(self):
+        """Живые частицы в буфер поля, погасшие с прошлого кадра схлопываются"""
+        particles = self.particles
+        count = particles.count
+        batch = self.batch
+        start = self.particle_vertices
+        if count:
+            batch.set_quad_rects(start, particles.lefts[:count], particles.bottoms[:count],
+                                 particles.rights[:count], particles.tops[:count])
+            batch.set_quad_colors(start, (particles.reds[:count], particles.greens[:count],
+                                          particles.blues[:count], particles.alphas[:count]))
+        if self.drawn_particles > count:
+            batch.hide_quads(start + count * 4, self.drawn_particles - count)
+        self.drawn_particles = count
+    
+    def render_swarm(self, alpha):
+        """Позиции и цвета роя в буфер поля (срезами по всей пачке)"""
+        sim = self.sim
+        xs = [prev + (x - prev) * alpha for prev, x in zip(self.prev_swarm_xs, sim.xs)]
+        ys = [prev + (y - prev) * alpha for prev, y in zip(self.prev_swarm_ys, sim.ys)]
+        self.batch.set_quads(self.swarm_vertices, xs, ys, sim.logo_size)
+        
+        # Цвет меняется только при отскоке: переписываются вершины сменивших цвет
+        colors = sim.colors
+        drawn = self.drawn_swarm_colors
+        if colors != drawn:
+            for i, color in enumerate(colors):
+                if color != drawn[i]:
+                    drawn[i] = color
+                    self.batch.set_color(self.swarm_vertices + i * 4, 4, COLORS[color])
     
     def on_touch_down(self, touch):
         """Обработка нажатий на квадрат"""
@@ -304,20 +1080,18 @@ class GameView(Widget):
         if not self.collide_point(*touch.pos):
             return False
         
-        # Локальные координаты
-        local_x = touch.pos[0] - self.pos[0]
-        local_y = touch.pos[1] - self.pos[1]
+        # Логические координаты поля
+        local_x, local_y = self.window_to_field(*touch.pos)
         
         # Проверка попадания в квадрат
-        if (self.box_x <= local_x <= self.box_x + BOX_SIZE and
-            self.box_y <= local_y <= self.box_y + BOX_SIZE):
-            
+        if self.sim.hit_test(local_x, local_y):
             # Случайное изменение направления
-            angle = random.uniform(0, 2 * math.pi)
-            speed = math.sqrt(self.velocity_x ** 2 + self.velocity_y ** 2)
-            self.velocity_x = math.cos(angle) * speed
-            self.velocity_y = math.sin(angle) * speed
-            
+            self.sim.redirect()
+            if frame_profiler.enabled:
+                frame_profiler.input_received(touch.time_start, self.sim.tick)
+            # Поворот виден на ближайшем vsync, а не после следующего кадра Clock
+            if self.immediate_input:
+                self.apply_input_now()
             return True
         
         return False
@@ -327,38 +1101,50 @@ class DVDScreensaverApp(App):
         super().__init__(**kwargs)
         self.root_layout = None
         self.game_view = None
+        self.store = PlayerDataStore(PLAYER_DATA_FILE)
         self.player_data = self.load_player_data()
-        self.score_label_texture = None
-        self.best_label_texture = None
-        self.score_rect = None
-        self.best_rect = None
+        self.history = GameHistory(HISTORY_DB_FILE)
+        self.history.migrate(self.player_data.get('records', []))
+        self.records_view = 'overall'
+        self.history_revision = 0
+        self.screen_cache = {}  # имя экрана -> (ключ данных, виджет)
+        self.score_text = None
+        self.best_text = None
+        self.playfield_fbo = None
+        self.playfield_key = None
+        self.profiler_label = None
+        self.profiler_rect = None
+        self.profiler_event = None
     
     def load_player_data(self):
         """Загрузка данных игрока"""
-        if os.path.exists('player_data.json'):
-            try:
-                with open('player_data.json', 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except:
-                pass
-        
-        return {
+        data = {
             'name': 'Майкл Скотт',
             'best_score': 0,
+            'best_scores': {},
             'games_played': 0,
             'total_time': 0,
             'sound_enabled': True,
+            'profiling': False,
+            'immediate_input': False,
+            'multi_logo': False,
             'speed': 1,
             'records': []
         }
+        
+        # Ключи, которых нет в старом файле, берутся по умолчанию
+        saved = self.store.load()
+        if isinstance(saved, dict):
+            data.update(saved)
+        # Рекорд из файла без режимов - рекорд обычного режима
+        data['best_scores'].setdefault(GameSimulation.mode, data['best_score'])
+        
+        frame_profiler.enabled = data['profiling']
+        return data
     
     def save_player_data(self):
-        """Сохранение данных игрока"""
-        try:
-            with open('player_data.json', 'w', encoding='utf-8') as f:
-                json.dump(self.player_data, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            print(f"Ошибка сохранения: {e}")
+        """Сохранение данных игрока (запись на диск в фоновом потоке)"""
+        self.store.save(self.player_data)
     
     def format_time(self, seconds):
         """Форматирование времени"""
@@ -371,778 +1157,669 @@ class DVDScreensaverApp(App):
         self.root_layout = FloatLayout()
         Window.clearcolor = AMBER_BG
         
+        # Атлас глифов HUD и текстура логотипа готовятся один раз при старте
+        get_glyph_atlas(sp(26))
+        get_logo_texture()
+        
         # Показать меню
         self.show_menu()
         
-        # Обработка изменения размера окна
-        Window.bind(on_resize=lambda *args: self.show_menu())
+        # Серия событий изменения размера (поворот, клавиатура) - одна раскладка
+        self.resize_trigger = Clock.create_trigger(self.relayout_screen, RESIZE_DEBOUNCE)
+        Window.bind(on_resize=self.on_window_resize)
+        
+        # Показанный кадр закрывает замер задержки отрисованных нажатий
+        Window.bind(on_flip=self.on_window_flip)
         
         return self.root_layout
     
-    def draw_menu_text(self, widget, frame_x, frame_y, frame_width):
+    def on_window_resize(self, window, width, height):
+        """Изменение размера окна: раскладка откладывается до конца серии событий"""
+        self.resize_trigger.cancel()
+        self.resize_trigger()
+    
+    def on_window_flip(self, window):
+        """Кадр выведен на экран"""
+        frame_profiler.frame_flipped()
+    
+    def relayout_screen(self, dt=None):
+        """Раскладка текущего экрана на месте (игра продолжается)"""
+        for screen in self.root_layout.children:
+            if isinstance(screen, ScreenWidget):
+                screen.relayout()
+    
+    def create_background(self, widget, color=AMBER_BG):
+        """Фон экрана во все окно"""
+        with widget.canvas.before:
+            Color(*color)
+            background = Rectangle()
+        
+        def layout():
+            background.size = Window.size
+        
+        widget.add_layout(layout)
+    
+    def create_label(self, widget, text, font_size, color, position, bold=False, halign='left'):
+        """Текст; position(texture) -> (x, y) для текущего размера окна"""
+        with widget.canvas:
+            Color(*color)
+            label = Rectangle()
+        
+        def layout():
+            texture = get_text_texture(text=text, font_size=sp(font_size), bold=bold, halign=halign)
+            place_text(label, texture, *position(texture))
+        
+        widget.add_layout(layout)
+        return label
+    
+    def create_title(self, widget, text):
+        """Заголовок экрана по центру сверху"""
+        self.create_label(
+            widget, text, 42, GRAY_DARK,
+            lambda texture: (Window.width/2 - texture.width/2, get_metrics().title_y),
+            bold=True
+        )
+    
+    def create_button(self, widget, text, font_size, bg_color, text_color, rect, on_press,
+                      bold=True, radius=14):
+        """Кнопка: скругленный фон и текст по центру; rect() -> прямоугольник из метрик"""
+        with widget.canvas:
+            Color(*bg_color)
+            background = RoundedRectangle()
+            Color(*text_color)
+            label = Rectangle()
+        
+        def layout():
+            x, y, width, height = rect()
+            background.pos = (x, y)
+            background.size = (width, height)
+            background.radius = [dp(radius)]
+            texture = get_text_texture(text=text, font_size=sp(font_size), bold=bold)
+            place_text(label, texture,
+                       x + width/2 - texture.width/2,
+                       y + height/2 - texture.height/2)
+        
+        widget.add_layout(layout)
+        widget.add_region(rect, on_press)
+        return background
+    
+    def draw_menu_text(self, widget):
         """Отрисовка текста меню"""
         # Заголовок
-        title_label = CoreLabel(
-            text='DVD ЗАСТАВКА\nФИЛИАЛ СКРЭНТОН',
-            font_size=sp(42),
-            bold=True,
-            halign='center'
+        self.create_label(
+            widget, 'DVD ЗАСТАВКА\nФИЛИАЛ СКРЭНТОН', 42, (1, 1, 1, 1),
+            lambda texture: (Window.width/2 - texture.width/2, get_metrics().menu_title_y),
+            bold=True, halign='center'
         )
-        title_label.refresh()
-        title_texture = title_label.texture
-        
-        with widget.canvas:
-            Color(1, 1, 1, 1)
-            Rectangle(
-                texture=title_texture,
-                pos=(Window.width/2 - title_texture.width/2, frame_y + dp(560)),
-                size=title_texture.size
-            )
         
         # Описание
-        desc_label = CoreLabel(
-            text='Не дай логотипу DVD достичь углов экрана!\nТапай по логотипу, чтобы изменить его направление.',
-            font_size=sp(22),
+        self.create_label(
+            widget,
+            'Не дай логотипу DVD достичь углов экрана!\nТапай по логотипу, чтобы изменить его направление.',
+            22, (1, 1, 1, 1),
+            lambda texture: (Window.width/2 - texture.width/2, get_metrics().menu_desc_y),
             halign='center'
         )
-        desc_label.refresh()
-        desc_texture = desc_label.texture
-        
-        with widget.canvas:
-            Color(1, 1, 1, 1)
-            Rectangle(
-                texture=desc_texture,
-                pos=(Window.width/2 - desc_texture.width/2, frame_y + dp(470)),
-                size=desc_texture.size
-            )
     
-    def create_info_blocks(self, widget, frame_x, frame_y, frame_width):
+    def create_info_blocks(self, widget):
         """Создание информационных блоков"""
-        # Адаптивная ширина блоков
-        total_spacing = dp(80)
-        block_width = (frame_width - total_spacing) / 3
-        block_height = dp(130)
-        spacing = dp(20)
-        start_x = frame_x + dp(40)
-        start_y = frame_y + dp(300)
-        
         # Блок Профиль
-        profile_x = start_x
-        with widget.canvas:
-            Color(1, 1, 1, 0.7)
-            RoundedRectangle(
-                pos=(profile_x, start_y),
-                size=(block_width, block_height),
-                radius=[dp(12)]
-            )
-        
         profile_text = f"ПРОФИЛЬ\n{self.player_data['name']}\nИгр: {self.player_data['games_played']}"
-        profile_label = CoreLabel(text=profile_text, font_size=sp(20), bold=True)
-        profile_label.refresh()
-        profile_texture = profile_label.texture
-        
-        with widget.canvas:
-            Color(1, 1, 1, 1)
-            Rectangle(
-                texture=profile_texture,
-                pos=(profile_x + block_width/2 - profile_texture.width/2,
-                     start_y + block_height/2 - profile_texture.height/2),
-                size=profile_texture.size
-            )
+        self.create_button(widget, profile_text, 20, (1, 1, 1, 0.7), (1, 1, 1, 1),
+                           lambda: get_metrics().info_blocks[0], self.show_profile_selection, radius=12)
         
         # Блок Рекорд
-        record_x = start_x + block_width + spacing
-        with widget.canvas:
-            Color(1, 1, 1, 0.7)
-            RoundedRectangle(
-                pos=(record_x, start_y),
-                size=(block_width, block_height),
-                radius=[dp(12)]
-            )
-        
-        record_text = f"РЕКОРД\n{self.format_time(self.player_data['best_score'])}\nОбщее: {self.format_time(self.player_data['total_time'])}"
-        record_label = CoreLabel(
-            text=record_text, 
-            font_size=sp(20), 
-            bold=True
-        )
-        record_label.refresh()
-        record_texture = record_label.texture
-        
-        with widget.canvas:
-            Color(1, 1, 1, 1)
-            Rectangle(
-                texture=record_texture,
-                pos=(record_x + block_width/2 - record_texture.width/2,
-                     start_y + block_height/2 - record_texture.height/2),
-                size=record_texture.size
-            )
+        record_text = f"РЕКОРД\n{self.format_time(self.best_score())}\nОбщее: {self.format_time(self.player_data['total_time'])}"
+        self.create_button(widget, record_text, 20, (1, 1, 1, 0.7), (1, 1, 1, 1),
+                           lambda: get_metrics().info_blocks[1], self.show_records, radius=12)
         
         # Блок Настройки
-        settings_x = start_x + (block_width + spacing) * 2
-        with widget.canvas:
-            Color(1, 1, 1, 0.7)
-            RoundedRectangle(
-                pos=(settings_x, start_y),
-                size=(block_width, block_height),
-                radius=[dp(12)]
-            )
-        
         sound_status = "ВКЛ" if self.player_data['sound_enabled'] else "ВЫКЛ"
         settings_text = f"НАСТРОЙКИ\nЗвук: {sound_status}\nСкорость: {self.player_data['speed']}"
-        settings_label = CoreLabel(text=settings_text, font_size=sp(20), bold=True)
-        settings_label.refresh()
-        settings_texture = settings_label.texture
-        
-        with widget.canvas:
-            Color(1, 1, 1, 1)
-            Rectangle(
-                texture=settings_texture,
-                pos=(settings_x + block_width/2 - settings_texture.width/2,
-                     start_y + block_height/2 - settings_texture.height/2),
-                size=settings_texture.size
-            )
-        
-        # Обработчики кликов на блоки
-        def on_touch_down(instance, touch):
-            # Профиль
-            if (profile_x <= touch.pos[0] <= profile_x + block_width and
-                start_y <= touch.pos[1] <= start_y + block_height):
-                self.show_profile_selection()
-                return True
-            
-            # Рекорд
-            if (record_x <= touch.pos[0] <= record_x + block_width and
-                start_y <= touch.pos[1] <= start_y + block_height):
-                self.show_records()
-                return True
-            
-            # Настройки
-            if (settings_x <= touch.pos[0] <= settings_x + block_width and
-                start_y <= touch.pos[1] <= start_y + block_height):
-                self.show_settings()
-                return True
-            
-            return False
-        
-        widget.bind(on_touch_down=on_touch_down)
+        self.create_button(widget, settings_text, 20, (1, 1, 1, 0.7), (1, 1, 1, 1),
+                           lambda: get_metrics().info_blocks[2], self.show_settings, radius=12)
     
     def show_menu(self):
         """Показать главное меню"""
-        self.root_layout.clear_widgets()
-        
-        menu_widget = Widget()
-        
-        with menu_widget.canvas.before:
-            Color(*AMBER_BG)
-            Rectangle(pos=(0, 0), size=Window.size)
-        
-        # Рамка телевизора - увеличенные максимальные размеры для Full HD
-        menu_width = min(Window.width - dp(100), dp(1000))
-        menu_height = min(Window.height - dp(100), dp(900))
-        frame_padding = dp(40)
-        frame_width = menu_width
-        frame_height = menu_height
-        frame_x = Window.width/2 - frame_width/2
-        frame_y = Window.height/2 - frame_height/2
+        self.show_screen('menu', self.screen_key('name', 'games_played', 'total_time',
+                                                 'sound_enabled', 'speed') + (self.best_score(),),
+                         self.build_menu)
+    
+    def build_menu(self):
+        """Сборка главного меню"""
+        menu_widget = ScreenWidget()
+        self.create_background(menu_widget)
         
         with menu_widget.canvas:
             # Внешняя темная рамка
             Color(*TV_FRAME_COLOR)
-            RoundedRectangle(
-                pos=(frame_x - dp(35), frame_y - dp(35)),
-                size=(frame_width + dp(70), frame_height + dp(70)),
-                radius=[dp(22)]
-            )
+            outer_frame = RoundedRectangle()
             
             # Внутренняя рамка (экран)
             Color(*TV_SCREEN_COLOR)
-            RoundedRectangle(
-                pos=(frame_x, frame_y),
-                size=(frame_width, frame_height),
-                radius=[dp(18)]
-            )
+            screen_frame = RoundedRectangle()
+        
+        def layout():
+            metrics = get_metrics()
+            outer_x, outer_y, outer_width, outer_height = metrics.menu_outer
+            outer_frame.pos = (outer_x, outer_y)
+            outer_frame.size = (outer_width, outer_height)
+            outer_frame.radius = [dp(22)]
+            frame_x, frame_y, frame_width, frame_height = metrics.menu_frame
+            screen_frame.pos = (frame_x, frame_y)
+            screen_frame.size = (frame_width, frame_height)
+            screen_frame.radius = [dp(18)]
+        
+        menu_widget.add_layout(layout)
         
         # Текст меню
-        self.draw_menu_text(menu_widget, frame_x, frame_y, frame_width)
+        self.draw_menu_text(menu_widget)
         
         # Информационные блоки
-        self.create_info_blocks(menu_widget, frame_x, frame_y, frame_width)
+        self.create_info_blocks(menu_widget)
         
         # Кнопка старта
-        self.create_start_button(menu_widget, frame_x, frame_y)
+        self.create_start_button(menu_widget)
         
-        self.root_layout.add_widget(menu_widget)
+        return menu_widget
     
     def show_profile_selection(self):
         """Экран выбора персонажа"""
-        self.root_layout.clear_widgets()
-        
-        profile_widget = Widget()
-        
-        with profile_widget.canvas.before:
-            Color(*AMBER_BG)
-            Rectangle(pos=(0, 0), size=Window.size)
-        
-        # Заголовок
-        title_label = CoreLabel(text='ВЫБОР ПЕРСОНАЖА', font_size=sp(42), bold=True)
-        title_label.refresh()
-        title_texture = title_label.texture
-        
-        with profile_widget.canvas:
-            Color(*GRAY_DARK)
-            Rectangle(
-                texture=title_texture,
-                pos=(Window.width/2 - title_texture.width/2, Window.height - dp(150)),
-                size=title_texture.size
-            )
+        self.show_screen('profile', self.screen_key('name'), self.build_profile_selection)
+    
+    def build_profile_selection(self):
+        """Сборка экрана выбора персонажа"""
+        profile_widget = ScreenWidget()
+        self.create_background(profile_widget)
+        self.create_title(profile_widget, 'ВЫБОР ПЕРСОНАЖА')
         
         # Список персонажей (2 колонки)
-        char_width = dp(340)
-        char_height = dp(85)
-        spacing = dp(22)
-        start_x = Window.width/2 - char_width - spacing/2
-        start_y = Window.height - dp(260)
-        
         for i, character in enumerate(CHARACTERS):
-            col = i % 2
-            row = i // 2
-            
-            char_x = start_x + col * (char_width + spacing)
-            char_y = start_y - row * (char_height + spacing)
-            
-            # Проверка выбранного персонажа
-            is_selected = self.player_data['name'] == character
-            
             # Цвет кнопки - цвет персонажа
-            bg_color = CHARACTER_COLORS[character]
-            
-            with profile_widget.canvas:
-                Color(*bg_color)
-                RoundedRectangle(
-                    pos=(char_x, char_y),
-                    size=(char_width, char_height),
-                    radius=[dp(14)]
-                )
+            self.create_button(
+                profile_widget, character, 24, CHARACTER_COLORS[character], (1, 1, 1, 1),
+                lambda i=i: get_metrics().character_buttons[i],
+                lambda character=character: self.select_character(character)
+            )
             
             # Если выбран - рамка
-            if is_selected:
+            if self.player_data['name'] == character:
                 with profile_widget.canvas:
                     Color(1, 1, 1, 1)
-                    Line(
-                        rounded_rectangle=(char_x, char_y, char_width, char_height, dp(14)),
-                        width=5
-                    )
-            
-            char_label = CoreLabel(text=character, font_size=sp(24), bold=True)
-            char_label.refresh()
-            char_texture = char_label.texture
-            
-            with profile_widget.canvas:
-                Color(1, 1, 1, 1)
-                Rectangle(
-                    texture=char_texture,
-                    pos=(char_x + char_width/2 - char_texture.width/2,
-                         char_y + char_height/2 - char_texture.height/2),
-                    size=char_texture.size
-                )
-        
-        # Обработчик кликов на персонажей
-        def on_character_select(instance, touch):
-            for i, character in enumerate(CHARACTERS):
-                col = i % 2
-                row = i // 2
+                    selection = Line(width=5)
                 
-                char_x = start_x + col * (char_width + spacing)
-                char_y = start_y - row * (char_height + spacing)
+                def layout(i=i, selection=selection):
+                    selection.rounded_rectangle = (*get_metrics().character_buttons[i], dp(14))
                 
-                if (char_x <= touch.pos[0] <= char_x + char_width and
-                    char_y <= touch.pos[1] <= char_y + char_height):
-                    self.player_data['name'] = character
-                    self.save_player_data()
-                    self.show_profile_selection()
-                    return True
-            return False
-        
-        profile_widget.bind(on_touch_down=on_character_select)
+                profile_widget.add_layout(layout)
         
         # Кнопка назад
         self.create_back_button(profile_widget)
         
-        self.root_layout.add_widget(profile_widget)
+        return profile_widget
+    
+    def select_character(self, character):
+        """Выбор персонажа"""
+        self.player_data['name'] = character
+        self.save_player_data()
+        self.show_profile_selection()
     
     def show_settings(self):
         """Экран настроек"""
-        self.root_layout.clear_widgets()
+        self.show_screen('settings', self.screen_key('sound_enabled', 'profiling', 'immediate_input',
+                                                     'multi_logo'),
+                         self.build_settings)
+    
+    def build_settings(self):
+        """Сборка экрана настроек"""
+        settings_widget = ScreenWidget()
+        self.create_background(settings_widget)
+        self.create_title(settings_widget, 'НАСТРОЙКИ')
         
-        settings_widget = Widget()
+        # Блок звука
+        self.create_toggle_setting(settings_widget, 'ЗВУК', 'sound_enabled', 0)
         
-        with settings_widget.canvas.before:
-            Color(*AMBER_BG)
-            Rectangle(pos=(0, 0), size=Window.size)
+        # Блок профилировщика кадра
+        self.create_toggle_setting(settings_widget, 'ПРОФИЛИРОВАНИЕ', 'profiling', 1)
         
-        # Заголовок
-        title_label = CoreLabel(text='НАСТРОЙКИ', font_size=sp(42), bold=True)
-        title_label.refresh()
-        title_texture = title_label.texture
+        # Мгновенное применение нажатия на логотип
+        self.create_toggle_setting(settings_widget, 'МГНОВЕННЫЙ ВВОД', 'immediate_input', 2)
         
-        with settings_widget.canvas:
-            Color(*GRAY_DARK)
-            Rectangle(
-                texture=title_texture,
-                pos=(Window.width/2 - title_texture.width/2, Window.height - dp(150)),
-                size=title_texture.size
-            )
+        # Сложный режим: рой логотипов вокруг логотипа игрока
+        self.create_toggle_setting(settings_widget, 'МНОГО ЛОГОТИПОВ', 'multi_logo', 3)
         
-        # Блок звука
-        sound_y = Window.height - dp(300)
-        sound_label = CoreLabel(text='ЗВУК', font_size=sp(32), bold=True)
-        sound_label.refresh()
-        sound_texture = sound_label.texture
+        # Кнопка назад
+        self.create_back_button(settings_widget)
         
-        with settings_widget.canvas:
-            Color(*GRAY_DARK)
-            Rectangle(
-                texture=sound_texture,
-                pos=(Window.width/2 - sound_texture.width/2, sound_y),
-                size=sound_texture.size
-            )
+        return settings_widget
+    
+    def create_toggle_setting(self, widget, title, key, row):
+        """Настройка с кнопками ВКЛ/ВЫКЛ для флага player_data[key] на месте row"""
+        enabled = self.player_data[key]
+        self.create_label(
+            widget, title, 32, GRAY_DARK,
+            lambda texture: (get_metrics().toggle_rows[row][0] - texture.width/2,
+                             get_metrics().toggle_rows[row][1]),
+            bold=True
+        )
         
         # Кнопки ВКЛ/ВЫКЛ
-        btn_width = dp(220)
-        btn_height = dp(85)
-        btn_spacing = dp(22)
-        btn_y = sound_y - dp(150)
-        
         # Кнопка ВКЛ
-        on_btn_x = Window.width/2 - btn_width - btn_spacing/2
-        on_bg_color = GRAY_DARK if self.player_data['sound_enabled'] else WHITE
-        
-        with settings_widget.canvas:
-            Color(*on_bg_color)
-            RoundedRectangle(
-                pos=(on_btn_x, btn_y),
-                size=(btn_width, btn_height),
-                radius=[dp(14)]
-            )
-        
-        on_label = CoreLabel(text='ВКЛ', font_size=sp(26), bold=True)
-        on_label.refresh()
-        on_texture = on_label.texture
-        
-        with settings_widget.canvas:
-            Color(1, 1, 1, 1) if self.player_data['sound_enabled'] else Color(*GRAY_DARK)
-            Rectangle(
-                texture=on_texture,
-                pos=(on_btn_x + btn_width/2 - on_texture.width/2,
-                     btn_y + btn_height/2 - on_texture.height/2),
-                size=on_texture.size
-            )
+        self.create_button(
+            widget, 'ВКЛ', 26,
+            GRAY_DARK if enabled else WHITE,
+            (1, 1, 1, 1) if enabled else GRAY_DARK,
+            lambda: get_metrics().toggle_rows[row][2],
+            lambda: self.set_setting(key, True)
+        )
         
         # Кнопка ВЫКЛ
-        off_btn_x = Window.width/2 + btn_spacing/2
-        off_bg_color = GRAY_DARK if not self.player_data['sound_enabled'] else WHITE
-        
-        with settings_widget.canvas:
-            Color(*off_bg_color)
-            RoundedRectangle(
-                pos=(off_btn_x, btn_y),
-                size=(btn_width, btn_height),
-                radius=[dp(14)]
-            )
-        
-        off_label = CoreLabel(text='ВЫКЛ', font_size=sp(26), bold=True)
-        off_label.refresh()
-        off_texture = off_label.texture
-        
-        with settings_widget.canvas:
-            Color(1, 1, 1, 1) if not self.player_data['sound_enabled'] else Color(*GRAY_DARK)
-            Rectangle(
-                texture=off_texture,
-                pos=(off_btn_x + btn_width/2 - off_texture.width/2,
-                     btn_y + btn_height/2 - off_texture.height/2),
-                size=off_texture.size
-            )
-        
-        # Обработчик кликов
-        def on_sound_toggle(instance, touch):
-            if (on_btn_x <= touch.pos[0] <= on_btn_x + btn_width and
-                btn_y <= touch.pos[1] <= btn_y + btn_height):
-                self.player_data['sound_enabled'] = True
-                self.save_player_data()
-                self.show_settings()
-                return True
-            
-            if (off_btn_x <= touch.pos[0] <= off_btn_x + btn_width and
-                btn_y <= touch.pos[1] <= btn_y + btn_height):
-                self.player_data['sound_enabled'] = False
-                self.save_player_data()
-                self.show_settings()
-                return True
-            
-            return False
-        
-        settings_widget.bind(on_touch_down=on_sound_toggle)
-        
-        # Кнопка назад
-        self.create_back_button(settings_widget)
-        
-        self.root_layout.add_widget(settings_widget)
+        self.create_button(
+            widget, 'ВЫКЛ', 26,
+            GRAY_DARK if not enabled else WHITE,
+            (1, 1, 1, 1) if not enabled else GRAY_DARK,
+            lambda: get_metrics().toggle_rows[row][3],
+            lambda: self.set_setting(key, False)
+        )
+    
+    def set_setting(self, key, value):
+        """Смена флага настроек"""
+        self.player_data[key] = value
+        if key == 'profiling':
+            frame_profiler.enabled = value
+        self.save_player_data()
+        self.show_settings()
     
-    def show_records(self):
+    def show_records(self, view=None):
         """Экран таблицы рекордов"""
-        self.root_layout.clear_widgets()
+        if view is not None:
+            self.records_view = view
         
-        records_widget = Widget()
+        # Каждый вид таблицы кэшируется отдельно, вкладки переключают готовые экраны
+        key = self.screen_key('name', 'multi_logo') + (self.history_revision,)
+        self.show_screen(f'records:{self.records_view}', key, self.build_records)
+    
+    def build_records(self):
+        """Сборка экрана таблицы рекордов для текущего вида"""
+        records_widget = ScreenWidget()
+        self.create_background(records_widget)
+        title = 'РЕКОРДЫ: СЛОЖНЫЙ' if self.player_data['multi_logo'] else 'ТАБЛИЦА РЕКОРДОВ'
+        self.create_title(records_widget, title)
         
-        with records_widget.canvas.before:
-            Color(*AMBER_BG)
-            Rectangle(pos=(0, 0), size=Window.size)
+        # Вкладки видов таблицы
+        self.create_records_tabs(records_widget)
         
-        # Заголовок
-        title_label = CoreLabel(text='ТАБЛИЦА РЕКОРДОВ', font_size=sp(42), bold=True)
-        title_label.refresh()
-        title_texture = title_label.texture
-        
-        with records_widget.canvas:
-            Color(*GRAY_DARK)
-            Rectangle(
-                texture=title_texture,
-                pos=(Window.width/2 - title_texture.width/2, Window.height - dp(150)),
-                size=title_texture.size
-            )
-        
-        # Таблица рекордов
-        records = self.player_data.get('records', [])
+        # Таблица рекордов из истории игр
+        records = self.load_records(self.records_view)
         
         if not records:
             # Нет рекордов
-            no_records_label = CoreLabel(
-                text='Пока нет рекордов.\nСыграйте первую игру!',
-                font_size=sp(26)
+            self.create_label(
+                records_widget, 'Пока нет рекордов.\nСыграйте первую игру!', 26, GRAY_DARK,
+                lambda texture: (Window.width/2 - texture.width/2, Window.height/2)
             )
-            no_records_label.refresh()
-            no_records_texture = no_records_label.texture
-            
-            with records_widget.canvas:
-                Color(*GRAY_DARK)
-                Rectangle(
-                    texture=no_records_texture,
-                    pos=(Window.width/2 - no_records_texture.width/2, Window.height/2),
-                    size=no_records_texture.size
-                )
         else:
-            # Показываем топ-10
-            start_y = Window.height - dp(240)
-            row_height = dp(65)
-            
-            for i, record in enumerate(records[:10]):
-                record_y = start_y - i * row_height
-                
+            rows = []
+            for i, record in enumerate(records):
                 # Получить цвет персонажа
                 character_name = record.get('name', 'Майкл Скотт')
                 character_color = CHARACTER_COLORS.get(character_name, (0.5, 0.5, 0.5, 1))
                 
-                # Фон строки - цвет персонажа
-                with records_widget.canvas:
-                    Color(*character_color)
-                    RoundedRectangle(
-                        pos=(dp(55), record_y),
-                        size=(Window.width - dp(110), row_height - dp(10)),
-                        radius=[dp(12)]
-                    )
-                
                 # Текст записи
-                record_text = f"{i+1}. {character_name} - {self.format_time(record['score'])} - {record['date']}"
-                record_label = CoreLabel(text=record_text, font_size=sp(22))
-                record_label.refresh()
-                record_texture = record_label.texture
+                if self.records_view == 'days':
+                    record_text = f"{record['date']} - {character_name} - {self.format_time(record['score'])}"
+                else:
+                    record_text = f"{i+1}. {character_name} - {self.format_time(record['score'])} - {record['date']}"
                 
+                # Фон строки - цвет персонажа
                 with records_widget.canvas:
+                    Color(*character_color)
+                    row_rect = RoundedRectangle()
                     Color(1, 1, 1, 1)
-                    Rectangle(
-                        texture=record_texture,
-                        pos=(dp(75), record_y + (row_height - record_texture.height)/2),
-                        size=record_texture.size
-                    )
+                    text_rect = Rectangle()
+                rows.append((record_text, row_rect, text_rect))
+            
+            def layout():
+                # Строки до кнопки назад, лишние скрываются
+                metrics = get_metrics()
+                for i, (record_text, row_rect, text_rect) in enumerate(rows):
+                    if i >= len(metrics.record_rows):
+                        row_rect.size = (0, 0)
+                        text_rect.size = (0, 0)
+                        continue
+                    
+                    row_x, row_y, row_width, row_height = metrics.record_rows[i]
+                    row_rect.pos = (row_x, row_y)
+                    row_rect.size = (row_width, row_height)
+                    row_rect.radius = [dp(12)]
+                    
+                    record_texture = get_text_texture(text=record_text, font_size=sp(22))
+                    place_text(text_rect, record_texture, metrics.record_text_x,
+                               row_y + (metrics.record_row_height - record_texture.height)/2)
+            
+            records_widget.add_layout(layout)
         
         # Кнопка назад
         self.create_back_button(records_widget)
         
-        self.root_layout.add_widget(records_widget)
+        return records_widget
+    
+    def screen_key(self, *fields):
+        """Ключ кэша экрана: показанные на нем поля player_data"""
+        return tuple(self.player_data[field] for field in fields)
+    
+    def show_screen(self, name, key, build):
+        """Показ экрана: готовое дерево виджетов из кэша или новая сборка"""
+        cached = self.screen_cache.get(name)
+        if cached is None or cached[0] != key:
+            cached = (key, build())
+            self.screen_cache[name] = cached
+        
+        # Экран из кэша мог быть разложен под прежний размер окна
+        screen = cached[1]
+        if screen.layout_size != tuple(Window.size):
+            screen.relayout()
+        
+        self.root_layout.clear_widgets()
+        self.root_layout.add_widget(screen)
+    
+    def game_mode(self):
+        """Режим игры из настроек: у каждого режима своя таблица рекордов"""
+        return MultiBoxSimulation.mode if self.player_data['multi_logo'] else GameSimulation.mode
+    
+    def best_score(self):
+        """Рекорд текущего режима игры"""
+        return self.player_data['best_scores'].get(self.game_mode(), 0)
+    
+    def load_records(self, view):
+        """Записи для вида таблицы рекордов в текущем режиме"""
+        mode = self.game_mode()
+        if view == 'character':
+            return self.history.top_by_character(self.player_data['name'], RECORDS_LIMIT, mode)
+        if view == 'days':
+            return self.history.best_per_day(RECORDS_LIMIT, mode)
+        return self.history.top_overall(RECORDS_LIMIT, mode)
+    
+    def create_records_tabs(self, widget):
+        """Вкладки: общий топ, топ текущего персонажа, лучшие по дням"""
+        for i, (view, title) in enumerate(RECORDS_VIEWS):
+            is_selected = view == self.records_view
+            self.create_button(
+                widget, title, 22,
+                GRAY_DARK if is_selected else WHITE,
+                (1, 1, 1, 1) if is_selected else GRAY_DARK,
+                lambda i=i: get_metrics().records_tabs[i],
+                lambda view=view: self.show_records(view),
+                radius=12
+            )
     
     def create_back_button(self, widget):
         """Кнопка назад в меню"""
-        btn_width = dp(340)
-        btn_height = dp(85)
-        btn_x = Window.width/2 - btn_width/2
-        btn_y = dp(75)
-        
-        with widget.canvas:
-            Color(*GRAY_DARK)
-            RoundedRectangle(pos=(btn_x, btn_y), size=(btn_width, btn_height), radius=[dp(14)])
+        self.create_button(
+            widget, 'НАЗАД', 26, GRAY_DARK, (1, 1, 1, 1),
+            lambda: get_metrics().back_button,
+            self.show_menu
+        )
+    
+    def create_start_button(self, widget):
+        """Создание кнопки старта"""
+        self.create_button(
+            widget, 'НАЧАТЬ ИГРУ', 30, GRAY_DARK, (1, 1, 1, 1),
+            lambda: get_metrics().start_button,
+            self.start_game
+        )
+    
+    def start_game(self):
+        """Запуск игры"""
+        self.root_layout.clear_widgets()
         
-        btn_label = CoreLabel(text='НАЗАД', font_size=sp(26), bold=True)
-        btn_label.refresh()
-        btn_texture = btn_label.texture
+        game_container = ScreenWidget()
+        self.create_background(game_container)
         
-        with widget.canvas:
+        # Рамка телевизора, фон и линии поля - один запеченный слой
+        tv_frame = Widget()
+        with tv_frame.canvas:
             Color(1, 1, 1, 1)
-            Rectangle(
-                texture=btn_texture,
-                pos=(btn_x + btn_width/2 - btn_texture.width/2,
-                     btn_y + btn_height/2 - btn_texture.height/2),
-                size=btn_texture.size
-            )
+            playfield_rect = Rectangle()
         
-        def on_back_click(w, touch):
-            if btn_x <= touch.pos[0] <= btn_x + btn_width and \
-               btn_y <= touch.pos[1] <= btn_y + btn_height:
-                self.show_menu()
-                return True
-            return False
+        game_container.add_widget(tv_frame)
         
-        widget.bind(on_touch_down=on_back_click)
-    
-    def create_start_button(self, widget, frame_x, frame_y):
-        """Создание кнопки старта"""
-        btn_width = dp(400)
-        btn_height = dp(95)
-        btn_x = Window.width/2 - btn_width/2
-        btn_y = frame_y + dp(160)
+        # Игровое поле (внутри рамки): логические 800x600 вписываются масштабом
+        self.game_view = GameView(size_hint=(None, None))
+        game_container.add_widget(self.game_view)
         
-        # Кнопка
-        with widget.canvas:
-            Color(*GRAY_DARK)
-            RoundedRectangle(pos=(btn_x, btn_y), size=(btn_width, btn_height), radius=[dp(14)])
+        def layout():
+            metrics = get_metrics()
+            field_x, field_y, field_width, field_height = metrics.field
+            self.game_view.pos = (field_x, field_y)
+            self.game_view.size = (field_width, field_height)
+            
+            # Слой перезапекается только при смене размера окна
+            place_text(playfield_rect, self.get_playfield_texture(),
+                       field_x - metrics.field_border, field_y - metrics.field_border)
         
-        # Текст кнопки
-        btn_label = CoreLabel(text='НАЧАТЬ ИГРУ', font_size=sp(30), bold=True)
-        btn_label.refresh()
-        btn_texture = btn_label.texture
+        game_container.add_layout(layout)
         
-        with widget.canvas:
-            Color(1, 1, 1, 1)
-            Rectangle(
-                texture=btn_texture,
-                pos=(btn_x + btn_width/2 - btn_texture.width/2,
-                     btn_y + btn_height/2 - btn_texture.height/2),
-                size=btn_texture.size
-            )
+        # UI элементы
+        self.create_game_ui(game_container)
+        self.create_game_buttons(game_container)
+        if frame_profiler.enabled:
+            frame_profiler.reset()
+            self.create_profiler_overlay(game_container)
         
-        def on_touch_down(w, touch):
-            if btn_x <= touch.pos[0] <= btn_x + btn_width and \
-               btn_y <= touch.pos[1] <= btn_y + btn_height:
-                self.start_game()
-                return True
-            return False
+        self.root_layout.add_widget(game_container)
         
-        widget.bind(on_touch_down=on_touch_down)
+        # Старт игры (скорость из профиля задает масштаб игрового времени)
+        self.game_view.immediate_input = self.player_data['immediate_input']
+        self.game_view.multi_logo = self.player_data['multi_logo']
+        self.game_view.start()
+        self.game_view.set_time_scale(self.player_data['speed'])
     
-    def start_game(self):
-        """Запуск игры"""
-        self.root_layout.clear_widgets()
-        
-        game_container = FloatLayout()
-        
-        # Фон
-        game_bg = Widget()
-        with game_bg.canvas.before:
-            Color(*AMBER_BG)
-            Rectangle(pos=(0, 0), size=Window.size)
-        game_container.add_widget(game_bg)
-        
-        # Рамка телевизора
-        tv_frame = Widget()
+    def get_playfield_texture(self):
+        """Статичный слой поля (перезапекается при смене размера окна или темы)"""
+        key = (tuple(Window.size), PLAYFIELD_THEME)
+        if self.playfield_key != key:
+            self.bake_playfield_layer()
+            self.playfield_key = key
+        return self.playfield_fbo.texture
+    
+    def bake_playfield_layer(self):
+        """Отрисовка рамки телевизора, фона и линий поля в offscreen-буфер"""
+        # Слой запекается под вписанный размер поля, линии - через тот же масштаб
+        field_width, field_height = get_metrics().field[2:]
+        scale = field_width / CANVAS_WIDTH
         frame_padding = dp(45)
-        frame_width = CANVAS_WIDTH + frame_padding * 2
-        frame_height = CANVAS_HEIGHT + frame_padding * 2
-        frame_x = Window.width/2 - frame_width/2
-        frame_y = Window.height/2 - frame_height/2
-        
-        with tv_frame.canvas:
+        frame_width = field_width + frame_padding * 2
+        frame_height = field_height + frame_padding * 2
+        border = dp(35)
+        field_x = border + frame_padding
+        field_y = border + frame_padding
+        
+        fbo = Fbo(size=(frame_width + border * 2, frame_height + border * 2))
+        with fbo:
+            ClearColor(0, 0, 0, 0)
+            ClearBuffers()
+            
             # Внешняя темная рамка
             Color(*TV_FRAME_COLOR)
             RoundedRectangle(
-                pos=(frame_x - dp(35), frame_y - dp(35)),
-                size=(frame_width + dp(70), frame_height + dp(70)),
+                pos=(0, 0),
+                size=fbo.size,
                 radius=[dp(22)]
             )
             
             # Внутренняя рамка (экран)
             Color(*TV_SCREEN_COLOR)
             RoundedRectangle(
-                pos=(frame_x, frame_y),
+                pos=(border, border),
                 size=(frame_width, frame_height),
                 radius=[dp(18)]
             )
+            
+            # Фон поля
+            Color(*BG_CANVAS)
+            Rectangle(pos=(field_x, field_y), size=(field_width, field_height))
+            
+            # Линии текстуры
+            Color(*LINE_COLOR)
+            for i in range(0, int(CANVAS_HEIGHT), 30):
+                Line(points=[field_x, field_y + i * scale,
+                             field_x + field_width, field_y + i * scale], width=1)
         
-        game_container.add_widget(tv_frame)
-        
-        # Игровое поле (внутри рамки)
-        canvas_container = FloatLayout(
-            pos_hint={'center_x': 0.5, 'center_y': 0.5},
-            size_hint=(None, None),
-            size=(CANVAS_WIDTH, CANVAS_HEIGHT)
-        )
-        
-        self.game_view = GameView(
-            pos_hint={'center_x': 0.5, 'center_y': 0.5},
-            size_hint=(None, None),
-            size=(CANVAS_WIDTH, CANVAS_HEIGHT)
-        )
-        canvas_container.add_widget(self.game_view)
-        game_container.add_widget(canvas_container)
-        
-        # UI элементы
-        self.create_game_ui(game_container)
-        self.create_game_buttons(game_container)
-        
-        self.root_layout.add_widget(game_container)
-        
-        # Старт игры
-        self.game_view.start()
+        fbo.draw()
+        # После потери GL-контекста (сворачивание на Android) слой рисуется заново
+        fbo.add_reload_observer(lambda *args: fbo.draw())
+        self.playfield_fbo = fbo
     
     def create_game_ui(self, container):
         """Создание UI игры"""
+        atlas = get_glyph_atlas(sp(26))
+        
         # Счет слева вверху
         score_widget = Widget()
-        score_label = CoreLabel(text='Время: 0:00', font_size=sp(26), bold=True)
-        score_label.refresh()
-        self.score_label_texture = score_label.texture
-        
         with score_widget.canvas:
             Color(*GRAY_DARK)
-            self.score_rect = Rectangle(
-                texture=self.score_label_texture,
-                pos=(dp(45), Window.height - dp(95)),
-                size=self.score_label_texture.size
-            )
+            self.score_text = AtlasText(atlas, 'Время: ')
+        self.score_text.set_value(self.format_time(0))
         container.add_widget(score_widget)
         
         # Лучший счет справа вверху
         best_widget = Widget()
-        best_label = CoreLabel(text=f"Рекорд: {self.format_time(self.player_data['best_score'])}", font_size=sp(26), bold=True)
-        best_label.refresh()
-        self.best_label_texture = best_label.texture
-        
         with best_widget.canvas:
             Color(*GRAY_DARK)
-            self.best_rect = Rectangle(
-                texture=self.best_label_texture,
-                pos=(Window.width - self.best_label_texture.width - dp(45), Window.height - dp(95)),
-                size=self.best_label_texture.size
-            )
+            self.best_text = AtlasText(atlas, 'Рекорд: ')
+        self.best_text.set_value(self.format_time(self.best_score()))
         container.add_widget(best_widget)
-    
-    def create_game_buttons(self, container):
-        """Создание кнопок паузы и выхода"""
-        # Кнопка паузы (слева)
-        pause_btn_width = dp(220)
-        pause_btn_height = dp(85)
-        pause_btn_x = Window.width/2 - pause_btn_width - dp(18)
-        pause_btn_y = dp(55)
-        
-        pause_widget = Widget()
         
-        with pause_widget.canvas:
-            Color(1, 1, 1, 1)
-            RoundedRectangle(pos=(pause_btn_x, pause_btn_y), size=(pause_btn_width, pause_btn_height), radius=[dp(14)])
+        def layout():
+            # Размер шрифта зависит от окна: атлас берется под текущий масштаб
+            atlas = get_glyph_atlas(sp(26))
+            self.score_text.set_atlas(atlas)
+            self.best_text.set_atlas(atlas)
+            metrics = get_metrics()
+            self.score_text.set_pos(metrics.hud_margin, metrics.hud_y)
+            self.best_text.set_pos(Window.width - self.best_text.width - metrics.hud_margin, metrics.hud_y)
         
-        pause_label = CoreLabel(text='Пауза', font_size=sp(24), bold=True)
-        pause_label.refresh()
-        pause_texture = pause_label.texture
+        container.add_layout(layout)
+    
+    def create_profiler_overlay(self, container):
+        """Оверлей профилировщика: перцентили кадра и пропущенные кадры"""
+        overlay_widget = Widget()
+        # Свой CoreLabel, чтобы часто меняющийся текст не вытеснял общий кэш
+        self.profiler_label = CoreLabel(text='', font_size=sp(18), bold=True)
         
-        with pause_widget.canvas:
+        with overlay_widget.canvas:
             Color(*GRAY_DARK)
-            Rectangle(
-                texture=pause_texture,
-                pos=(pause_btn_x + pause_btn_width/2 - pause_texture.width/2,
-                     pause_btn_y + pause_btn_height/2 - pause_texture.height/2),
-                size=pause_texture.size
-            )
+            self.profiler_rect = Rectangle(pos=(Window.width/2, get_metrics().hud_y), size=(0, 0))
+        container.add_widget(overlay_widget)
         
-        def on_pause_touch(w, touch):
-            if pause_btn_x <= touch.pos[0] <= pause_btn_x + pause_btn_width and \
-               pause_btn_y <= touch.pos[1] <= pause_btn_y + pause_btn_height:
-                self.game_view.pause()
-                return True
-            return False
+        self.stop_profiler_overlay()
+        self.profiler_event = Clock.schedule_interval(self.update_profiler_overlay, PROFILE_OVERLAY_INTERVAL)
+    
+    def update_profiler_overlay(self, dt):
+        """Обновление текста оверлея профилировщика"""
+        stats = frame_profiler.summary()
+        self.profiler_label.text = (
+            f"кадр p50 {stats['frame_p50']:.1f} p95 {stats['frame_p95']:.1f} "
+            f"p99 {stats['frame_p99']:.1f} мс | пропущено {stats['dropped_frames']}"
+        )
+        if stats['inputs']:
+            self.profiler_label.text += f" | ввод p50 {stats['input_p50']:.0f} p99 {stats['input_p99']:.0f} мс"
+        self.profiler_label.refresh()
+        texture = self.profiler_label.texture
+        self.profiler_rect.texture = texture
+        self.profiler_rect.size = texture.size
+        self.profiler_rect.pos = (Window.width/2 - texture.width/2, get_metrics().hud_y)
+    
+    def stop_profiler_overlay(self):
+        """Остановка оверлея и выгрузка буферов профилировщика"""
+        if self.profiler_event:
+            self.profiler_event.cancel()
+            self.profiler_event = None
+            self.dump_frame_profile()
+    
+    def dump_frame_profile(self):
+        """Запись буферов профилировщика рядом с player_data.json"""
+        try:
+            frame_profiler.dump(PROFILE_DUMP_FILE, extra={
+                'text_cache': {'hits': text_cache.hits, 'misses': text_cache.misses}
+            })
+        except Exception as e:
+            print(f"Ошибка записи профиля: {e}")
+    
+    def create_game_buttons(self, container):
+        """Создание кнопок паузы и выхода"""
+        # Отдельный слой, чтобы кнопки рисовались поверх поля
+        buttons_widget = ScreenWidget()
         
-        pause_widget.bind(on_touch_down=on_pause_touch)
-        container.add_widget(pause_widget)
+        # Кнопка паузы (слева)
+        self.create_button(
+            buttons_widget, 'Пауза', 24, (1, 1, 1, 1), GRAY_DARK,
+            lambda: get_metrics().pause_button,
+            lambda: self.game_view.pause()
+        )
         
         # Кнопка выхода (справа)
-        exit_btn_width = dp(220)
-        exit_btn_height = dp(85)
-        exit_btn_x = Window.width/2 + dp(18)
-        exit_btn_y = dp(55)
-        
-        exit_widget = Widget()
-        
-        with exit_widget.canvas:
-            Color(0.9, 0.9, 0.9, 1)
-            RoundedRectangle(pos=(exit_btn_x, exit_btn_y), size=(exit_btn_width, exit_btn_height), radius=[dp(14)])
-        
-        exit_label = CoreLabel(text='Выйти', font_size=sp(24), bold=True)
-        exit_label.refresh()
-        exit_texture = exit_label.texture
-        
-        with exit_widget.canvas:
-            Color(*GRAY_DARK)
-            Rectangle(
-                texture=exit_texture,
-                pos=(exit_btn_x + exit_btn_width/2 - exit_texture.width/2,
-                     exit_btn_y + exit_btn_height/2 - exit_texture.height/2),
-                size=exit_texture.size
-            )
-        
-        def on_exit_touch(w, touch):
-            if exit_btn_x <= touch.pos[0] <= exit_btn_x + exit_btn_width and \
-               exit_btn_y <= touch.pos[1] <= exit_btn_y + exit_btn_height:
-                self.exit_game()
-                return True
-            return False
+        self.create_button(
+            buttons_widget, 'Выйти', 24, (0.9, 0.9, 0.9, 1), GRAY_DARK,
+            lambda: get_metrics().exit_button,
+            self.exit_game
+        )
         
-        exit_widget.bind(on_touch_down=on_exit_touch)
-        container.add_widget(exit_widget)
+        container.add_widget(buttons_widget)
+    
+    def on_pause(self):
+        """Приложение свернуто: игра ставится на паузу, цикл останавливается"""
+        if self.game_view and self.game_view.is_running():
+            self.game_view.pause()
+        # Свернутое приложение система может выгрузить без on_stop
+        self.store.flush()
+        return True
+    
+    def on_stop(self):
+        """Закрытие приложения: дописать очередь сохранений"""
+        self.store.close()
+        self.history.close()
     
     def exit_game(self):
         """Выход из игры"""
         if self.game_view:
             self.game_view.stop()
+        self.stop_profiler_overlay()
         self.show_menu()
     
     def update_score(self, score):
         """Обновление счета"""
-        score_label = CoreLabel(text=f'Время: {self.format_time(score)}', font_size=sp(26), bold=True)
-        score_label.refresh()
-        self.score_label_texture = score_label.texture
-        self.score_rect.texture = self.score_label_texture
-        self.score_rect.size = self.score_label_texture.size
+        self.score_text.set_value(self.format_time(score))
     
     def game_over(self, score):
         """Окончание игры"""
+        self.stop_profiler_overlay()
+        
         # Обновить статистику
         self.player_data['games_played'] += 1
         self.player_data['total_time'] += score
         
-        if score > self.player_data['best_score']:
-            self.player_data['best_score'] = score
-        
-        # Добавить в таблицу рекордов
-        record = {
-            'name': self.player_data['name'],
-            'score': score,
-            'date': datetime.now().strftime('%Y-%m-%d')
-        }
-        
-        if 'records' not in self.player_data:
-            self.player_data['records'] = []
+        # Рекорд у каждого режима свой; best_score - рекорд обычного режима для старых версий
+        sim = self.game_view.sim
+        best_scores = self.player_data['best_scores']
+        if score > best_scores.get(sim.mode, 0):
+            best_scores[sim.mode] = score
+        self.player_data['best_score'] = best_scores[GameSimulation.mode]
+        
+        # Каждая игра пишется в историю, топ берется запросом по индексу
+        self.history.add_game(
+            self.player_data['name'],
+            score,
+            datetime.now().strftime('%Y-%m-%d'),
+            sim.bounces,
+            sim.taps,
+            sim.session_log()
+        )
+        self.history_revision += 1
         
-        self.player_data['records'].append(record)
-        self.player_data['records'].sort(key=lambda x: x['score'], reverse=True)
-        self.player_data['records'] = self.player_data['records'][:10]
+        # Топ-10 в player_data.json остается для совместимости со старыми версиями
+        self.player_data['records'] = self.history.top_overall(RECORDS_LIMIT)
         
         self.save_player_data()
         
@@ -1153,50 +1830,27 @@ class DVDScreensaverApp(App):
         """Экран Game Over"""
         self.root_layout.clear_widgets()
         
-        gameover_widget = Widget()
-        
-        with gameover_widget.canvas.before:
-            Color(254/255, 243/255, 199/255, 0.9)
-            Rectangle(pos=(0, 0), size=Window.size)
+        gameover_widget = ScreenWidget()
+        self.create_background(gameover_widget, (254/255, 243/255, 199/255, 0.9))
         
         # Заголовок
-        title_label = CoreLabel(text='ИГРА ОКОНЧЕНА', font_size=sp(46), bold=True)
-        title_label.refresh()
-        title_texture = title_label.texture
-        
-        with gameover_widget.canvas:
-            Color(*GRAY_DARK)
-            Rectangle(
-                texture=title_texture,
-                pos=(Window.width/2 - title_texture.width/2, Window.height - dp(230)),
-                size=title_texture.size
-            )
+        self.create_label(
+            gameover_widget, 'ИГРА ОКОНЧЕНА', 46, GRAY_DARK,
+            lambda texture: (Window.width/2 - texture.width/2, get_metrics().gameover_title_y),
+            bold=True
+        )
         
         # Счет
-        score_label = CoreLabel(text=f'Время выживания: {self.format_time(score)}', font_size=sp(34))
-        score_label.refresh()
-        score_texture = score_label.texture
-        
-        with gameover_widget.canvas:
-            Color(*GRAY_DARK)
-            Rectangle(
-                texture=score_texture,
-                pos=(Window.width/2 - score_texture.width/2, Window.height - dp(330)),
-                size=score_texture.size
-            )
+        self.create_label(
+            gameover_widget, f'Время выживания: {self.format_time(score)}', 34, GRAY_DARK,
+            lambda texture: (Window.width/2 - texture.width/2, get_metrics().gameover_score_y)
+        )
         
         # Лучший счет
-        best_label = CoreLabel(text=f"Лучший рекорд: {self.format_time(self.player_data['best_score'])}", font_size=sp(26))
-        best_label.refresh()
-        best_texture = best_label.texture
-        
-        with gameover_widget.canvas:
-            Color(*GRAY_DARK)
-            Rectangle(
-                texture=best_texture,
-                pos=(Window.width/2 - best_texture.width/2, Window.height - dp(400)),
-                size=best_texture.size
-            )
+        self.create_label(
+            gameover_widget, f"Лучший рекорд: {self.format_time(self.best_score())}", 26, GRAY_DARK,
+            lambda texture: (Window.width/2 - texture.width/2, get_metrics().gameover_best_y)
+        )
         
         # Кнопка рестарта
         self.create_restart_button(gameover_widget)
@@ -1208,69 +1862,20 @@ class DVDScreensaverApp(App):
     
     def create_restart_button(self, widget):
         """Кнопка рестарта"""
-        btn_width = dp(400)
-        btn_height = dp(95)
-        btn_x = Window.width/2 - btn_width/2
-        btn_y = dp(250)
-        
-        with widget.canvas:
-            Color(*GRAY_DARK)
-            RoundedRectangle(pos=(btn_x, btn_y), size=(btn_width, btn_height), radius=[dp(14)])
-        
-        btn_label = CoreLabel(text='ИГРАТЬ СНОВА', font_size=sp(30), bold=True)
-        btn_label.refresh()
-        btn_texture = btn_label.texture
-        
-        with widget.canvas:
-            Color(1, 1, 1, 1)
-            Rectangle(
-                texture=btn_texture,
-                pos=(btn_x + btn_width/2 - btn_texture.width/2,
-                     btn_y + btn_height/2 - btn_texture.height/2),
-                size=btn_texture.size
-            )
-        
-        def on_touch_down(w, touch):
-            if btn_x <= touch.pos[0] <= btn_x + btn_width and \
-               btn_y <= touch.pos[1] <= btn_y + btn_height:
-                self.start_game()
-                return True
-            return False
-        
-        widget.bind(on_touch_down=on_touch_down)
+        self.create_button(
+            widget, 'ИГРАТЬ СНОВА', 30, GRAY_DARK, (1, 1, 1, 1),
+            lambda: get_metrics().restart_button,
+            self.start_game
+        )
     
     def create_menu_button(self, widget):
         """Кнопка меню"""
-        btn_width = dp(400)
-        btn_height = dp(85)
-        btn_x = Window.width/2 - btn_width/2
-        btn_y = dp(145)
-        
-        with widget.canvas:
-            Color(1, 1, 1, 1)
-            RoundedRectangle(pos=(btn_x, btn_y), size=(btn_width, btn_height), radius=[dp(14)])
-        
-        btn_label = CoreLabel(text='Главное меню', font_size=sp(24))
-        btn_label.refresh()
-        btn_texture = btn_label.texture
-        
-        with widget.canvas:
-            Color(*GRAY_DARK)
-            Rectangle(
-                texture=btn_texture,
-                pos=(btn_x + btn_width/2 - btn_texture.width/2,
-                     btn_y + btn_height/2 - btn_texture.height/2),
-                size=btn_texture.size
-            )
-        
-        def on_touch_down(w, touch):
-            if btn_x <= touch.pos[0] <= btn_x + btn_width and \
-               btn_y <= touch.pos[1] <= btn_y + btn_height:
-                self.show_menu()
-                return True
-            return False
-        
-        widget.bind(on_touch_down=on_touch_down)
+        self.create_button(
+            widget, 'Главное меню', 24, (1, 1, 1, 1), GRAY_DARK,
+            lambda: get_metrics().menu_button,
+            self.show_menu,
+            bold=False
+        )
 
 if __name__ == '__main__':
     DVDScreensaverApp().run()
@@ -0,0 +1,135 @@
+"""Пул частиц: искры отскоков и след логотипа.
+
+Частицы живут в плоских массивах фиксированной емкости. Живые лежат
+плотно в начале массивов, а погасшую частицу заменяет последняя живая,
+поэтому ни рождение, ни гашение частицы не выделяют память. Один проход
+update двигает частицы, гасит истекшие и сразу пишет края квадратов и
+прозрачность, которые отрисовка забирает одной пачкой.
+
+Случайность частиц - свой генератор, не генератор игры: эффекты не
+влияют на воспроизведение сессии по зерну.
+"""
+import math
+import random
+from array import array
+
+PARTICLE_CAPACITY = 1024  # Максимум живых частиц
+PARTICLE_DRAG = 3.0  # Торможение частиц, доля скорости в секунду
+
+class ParticlePool:
+    """Пул частиц фиксированной емкости"""
+    
+    def __init__(self, capacity=PARTICLE_CAPACITY, seed=None):
+        self.capacity = capacity
+        self.count = 0
+        self.dropped = 0
+        self.rng = random.Random(seed)
+        
+        def floats():
+            return array('f', bytes(4 * capacity))
+        
+        # Состояние частиц
+        self.xs = floats()
+        self.ys = floats()
+        self.vxs = floats()
+        self.vys = floats()
+        self.ages = floats()
+        self.lifetimes = floats()
+        self.sizes = floats()
+        self.reds = floats()
+        self.greens = floats()
+        self.blues = floats()
+        
+        # Результат прохода update для отрисовки
+        self.lefts = floats()
+        self.bottoms = floats()
+        self.rights = floats()
+        self.tops = floats()
+        self.alphas = floats()
+    
+    def spawn(self, x, y, vx, vy, lifetime, size, rgb):
+        """Новая частица; при полном пуле не рождается"""
+        i = self.count
+        if i >= self.capacity:
+            self.dropped += 1
+            return False
+        
+        self.xs[i] = x
+        self.ys[i] = y
+        self.vxs[i] = vx
+        self.vys[i] = vy
+        self.ages[i] = 0.0
+        self.lifetimes[i] = lifetime
+        self.sizes[i] = size
+        self.reds[i], self.greens[i], self.blues[i] = rgb[:3]
+        
+        # Видна уже в кадре рождения, до первого update
+        half = size / 2
+        self.lefts[i] = x - half
+        self.bottoms[i] = y - half
+        self.rights[i] = x + half
+        self.tops[i] = y + half
+        self.alphas[i] = 1.0
+        self.count = i + 1
+        return True
+    
+    def burst(self, x, y, count, speed, lifetime, size, rgb, angle=0.0, spread=2 * math.pi):
+        """Вспышка count частиц в секторе spread вокруг направления angle"""
+        rng = self.rng
+        for _ in range(count):
+            direction = angle + (rng.random() - 0.5) * spread
+            velocity = speed * (0.3 + 0.7 * rng.random())
+            if not self.spawn(x, y, math.cos(direction) * velocity, math.sin(direction) * velocity,
+                              lifetime * (0.5 + 0.5 * rng.random()), size, rgb):
+                return
+    
+    def update(self, dt):
+        """Один проход по живым частицам: движение, гашение и геометрия"""
+        xs, ys, vxs, vys = self.xs, self.ys, self.vxs, self.vys
+        ages, lifetimes, sizes = self.ages, self.lifetimes, self.sizes
+        lefts, bottoms, rights, tops, alphas = self.lefts, self.bottoms, self.rights, self.tops, self.alphas
+        damping = max(0.0, 1.0 - PARTICLE_DRAG * dt)
+        
+        i = 0
+        count = self.count
+        while i < count:
+            age = ages[i] + dt
+            if age >= lifetimes[i]:
+                # На место погасшей - последняя живая, она обрабатывается следующей
+                count -= 1
+                if i < count:
+                    self.move(count, i)
+                continue
+            
+            ages[i] = age
+            vx = vxs[i] * damping
+            vy = vys[i] * damping
+            vxs[i] = vx
+            vys[i] = vy
+            x = xs[i] + vx * dt
+            y = ys[i] + vy * dt
+            xs[i] = x
+            ys[i] = y
+            
+            # Частица гаснет и сжимается к концу жизни
+            fade = 1.0 - age / lifetimes[i]
+            half = sizes[i] * fade / 2
+            lefts[i] = x - half
+            bottoms[i] = y - half
+            rights[i] = x + half
+            tops[i] = y + half
+            alphas[i] = fade
+            i += 1
+        
+        self.count = count
+    
+    def move(self, source, target):
+        """Перенос частицы source на место target"""
+        for values in (self.xs, self.ys, self.vxs, self.vys, self.ages, self.lifetimes,
+                       self.sizes, self.reds, self.greens, self.blues):
+            values[target] = values[source]
+    
+    def clear(self):
+        """Гашение всех частиц"""
+        self.count = 0
+        self.dropped = 0
@@ -0,0 +1,213 @@
+"""Встроенный профилировщик кадра.
+
+Время фаз кадра (физика, отрисовка, растеризация текста, HUD) пишется
+по монотонным часам в кольцевые буферы фиксированного размера, поэтому
+включенный профилировщик не выделяет память на каждый кадр.
+Содержимое буферов можно выгрузить в JSON для разбора медленных сессий.
+
+Задержка ввода считается от метки времени касания (time.time() в
+MotionEvent Kivy) до flip окна с первым кадром, где уже видно движение
+после нажатия (нарисованное время физики позже тика нажатия), и копится
+в гистограмме с корзинами фиксированной ширины.
+"""
+import json
+import time
+from array import array
+from datetime import datetime
+
+PROFILE_PHASES = ('frame', 'physics', 'render', 'text', 'hud')
+PROFILE_BUFFER_SIZE = 600  # Около 10 секунд при 60 FPS
+DROPPED_FRAME_FACTOR = 1.5  # Кадр пропущен, если интервал больше 1.5 бюджета
+LATENCY_BUCKET_MS = 2  # Ширина корзины гистограммы задержки ввода
+LATENCY_BUCKETS = 100  # До 200 мс, последняя корзина - все, что больше
+
+class RingBuffer:
+    """Кольцевой буфер замеров (мс)"""
+    
+    def __init__(self, size=PROFILE_BUFFER_SIZE):
+        self.size = size
+        self.values = array('d', bytes(8 * size))
+        self.index = 0
+        self.count = 0
+    
+    def add(self, value):
+        """Запись замера поверх самого старого"""
+        self.values[self.index] = value
+        self.index = (self.index + 1) % self.size
+        if self.count < self.size:
+            self.count += 1
+    
+    def ordered(self):
+        """Замеры от старых к новым"""
+        if self.count < self.size:
+            return list(self.values[:self.count])
+        return list(self.values[self.index:]) + list(self.values[:self.index])
+    
+    def percentile(self, pct):
+        """Перцентиль по текущему содержимому буфера"""
+        if not self.count:
+            return 0.0
+        values = sorted(self.values[:self.count])
+        return values[min(self.count - 1, int(round(pct / 100 * (self.count - 1))))]
+    
+    def clear(self):
+        """Очистка буфера"""
+        self.index = 0
+        self.count = 0
+
+class LatencyHistogram:
+    """Гистограмма задержек (мс) с корзинами фиксированной ширины"""
+    
+    def __init__(self, bucket_ms=LATENCY_BUCKET_MS, buckets=LATENCY_BUCKETS):
+        self.bucket_ms = bucket_ms
+        self.counts = array('I', bytes(4 * buckets))
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+    
+    def add(self, value):
+        """Запись задержки в ее корзину"""
+        index = min(int(value // self.bucket_ms), len(self.counts) - 1)
+        self.counts[index] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+    
+    def percentile(self, pct):
+        """Перцентиль по верхней границе корзины"""
+        if not self.count:
+            return 0.0
+        rank = pct / 100 * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return (index + 1) * self.bucket_ms
+        return len(self.counts) * self.bucket_ms
+    
+    def clear(self):
+        """Очистка гистограммы"""
+        for index in range(len(self.counts)):
+            self.counts[index] = 0
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+    
+    def to_dict(self):
+        """Корзины и сводка для выгрузки в JSON"""
+        return {
+            'bucket_ms': self.bucket_ms,
+            'counts': list(self.counts),
+            'count': self.count,
+            'mean': self.total / self.count if self.count else 0.0,
+            'max': self.max,
+        }
+
+class FrameProfiler:
+    """Профилировщик фаз кадра"""
+    
+    def __init__(self, frame_budget, size=PROFILE_BUFFER_SIZE):
+        self.enabled = False
+        self.frame_budget = frame_budget
+        self.buffers = {phase: RingBuffer(size) for phase in PROFILE_PHASES}
+        self.intervals = RingBuffer(size)
+        self.frames = 0
+        self.dropped_frames = 0
+        self.last_frame_start = None
+        
+        # Нажатия: еще не видные на экране (тик, метка времени) и ждущие flip окна
+        self.latency = LatencyHistogram()
+        self.pending_inputs = []
+        self.drawn_inputs = []
+    
+    # Монотонные часы высокого разрешения
+    now = staticmethod(time.perf_counter)
+    
+    def record(self, phase, start):
+        """Запись длительности фазы, начатой в момент start"""
+        self.buffers[phase].add((time.perf_counter() - start) * 1000.0)
+    
+    def frame_started(self, start):
+        """Начало кадра: интервал между кадрами и подсчет пропущенных"""
+        if self.last_frame_start is not None:
+            interval = start - self.last_frame_start
+            self.intervals.add(interval * 1000.0)
+            if interval > self.frame_budget * DROPPED_FRAME_FACTOR:
+                self.dropped_frames += int(interval / self.frame_budget) - 1
+        self.last_frame_start = start
+        self.frames += 1
+    
+    def input_received(self, timestamp, tick):
+        """Нажатие, изменившее движение на тике tick (timestamp - time.time() касания)"""
+        self.pending_inputs.append((tick, timestamp))
+    
+    def input_drawn(self, drawn_time):
+        """Сцена отрисована на момент drawn_time (тики физики)
+        
+        Нажатие видно, только если нарисованное время позже его тика: кадр
+        без шага после поворота показывает прежнее положение. Видные
+        нажатия ждут следующего flip.
+        """
+        pending = self.pending_inputs
+        visible = 0
+        while visible < len(pending) and pending[visible][0] < drawn_time:
+            self.drawn_inputs.append(pending[visible][1])
+            visible += 1
+        del pending[:visible]
+    
+    def frame_flipped(self):
+        """Кадр показан: задержка отрисованных нажатий уходит в гистограмму"""
+        if not self.drawn_inputs:
+            return
+        now = time.time()
+        for timestamp in self.drawn_inputs:
+            self.latency.add(max(0.0, (now - timestamp) * 1000.0))
+        self.drawn_inputs.clear()
+    
+    def pause(self):
+        """Разрыв серии кадров (пауза, меню) не считается пропуском"""
+        self.last_frame_start = None
+    
+    def reset(self):
+        """Очистка всех буферов и счетчиков"""
+        for buffer in self.buffers.values():
+            buffer.clear()
+        self.intervals.clear()
+        self.latency.clear()
+        self.pending_inputs.clear()
+        self.drawn_inputs.clear()
+        self.frames = 0
+        self.dropped_frames = 0
+        self.last_frame_start = None
+    
+    def summary(self):
+        """Перцентили длительности кадра, интервалов и задержки ввода (мс)"""
+        frame = self.buffers['frame']
+        return {
+            'frame_p50': frame.percentile(50),
+            'frame_p95': frame.percentile(95),
+            'frame_p99': frame.percentile(99),
+            'interval_p50': self.intervals.percentile(50),
+            'interval_p99': self.intervals.percentile(99),
+            'input_p50': self.latency.percentile(50),
+            'input_p99': self.latency.percentile(99),
+            'inputs': self.latency.count,
+            'frames': self.frames,
+            'dropped_frames': self.dropped_frames,
+        }
+    
+    def dump(self, path, extra=None):
+        """Выгрузка буферов в JSON"""
+        data = {
+            'date': datetime.now().isoformat(timespec='seconds'),
+            'frame_budget_ms': self.frame_budget * 1000.0,
+            'summary': self.summary(),
+            'phases_ms': {phase: buffer.ordered() for phase, buffer in self.buffers.items()},
+            'intervals_ms': self.intervals.ordered(),
+            'input_latency_ms': self.latency.to_dict(),
+        }
+        if extra:
+            data.update(extra)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
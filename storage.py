@@ -0,0 +1,251 @@
+"""Сохранение данных игрока и истории игр.
+
+Запись идет в фоновом потоке и атомарно: снимок данных пишется во
+временный файл рядом с целевым, сбрасывается на диск и переименовывается
+поверх старого. Обрыв записи оставляет прежний файл целым. Частые
+сохранения подряд объединяются, на диск уходит только последний снимок.
+
+История всех игр хранится отдельно в SQLite: индексы по режиму игры и
+счету, персонажу и дате отвечают на запросы таблиц рекордов без
+сортировки всей истории. Обычный и сложный режимы - разные таблицы.
+"""
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+SAVE_COALESCE_DELAY = 0.2  # Ожидание следующих сохранений перед записью, с
+HISTORY_SCHEMA_VERSION = 3
+DEFAULT_MODE = 'normal'  # Режим игр, записанных до появления режимов
+
+HISTORY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    score REAL NOT NULL,
+    date TEXT NOT NULL,
+    bounces INTEGER NOT NULL DEFAULT 0,
+    taps INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+# Версия 3: режим игры, индексы таблиц рекордов начинаются с режима
+HISTORY_INDEXES = (
+    'DROP INDEX IF EXISTS games_score',
+    'DROP INDEX IF EXISTS games_name_score',
+    'DROP INDEX IF EXISTS games_date_score',
+    'CREATE INDEX games_mode_score ON games (mode, score)',
+    'CREATE INDEX games_mode_name_score ON games (mode, name, score)',
+    'CREATE INDEX games_mode_date_score ON games (mode, date, score)',
+)
+
+# Журнал сессии для повтора (версия 2): зерно, финальный тик, тики нажатий
+HISTORY_LOG_COLUMNS = ('seed INTEGER', 'ticks INTEGER', 'tap_ticks TEXT')
+HISTORY_MODE_COLUMN = f"mode TEXT NOT NULL DEFAULT '{DEFAULT_MODE}'"
+HISTORY_FIELDS = 'name, score, date, bounces, taps, seed, ticks, tap_ticks, mode'
+
+class PlayerDataStore:
+    """Атомарное фоновое хранилище JSON-данных игрока"""
+    
+    def __init__(self, path, delay=SAVE_COALESCE_DELAY):
+        self.path = path
+        self.delay = delay
+        self.condition = threading.Condition()
+        self.pending = None
+        self.deadline = 0.0
+        self.writing = False
+        self.flushing = False
+        self.closed = False
+        self.thread = None
+    
+    def load(self):
+        """Чтение данных (старый формат с отступами читается так же)"""
+        if not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Ошибка загрузки: {e}")
+            return None
+    
+    def save(self, data):
+        """Снимок данных в очередь записи (не ждет диска)"""
+        # Компактная сериализация на вызывающем потоке - данные дальше не разделяются
+        payload = json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+        with self.condition:
+            # Срок записи отсчитывается от первого сохранения пачки
+            if self.pending is None:
+                self.deadline = time.monotonic() + self.delay
+            self.pending = payload
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, name='player-data-writer', daemon=True)
+                self.thread.start()
+            self.condition.notify_all()
+    
+    def run(self):
+        """Цикл фонового потока записи"""
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: self.pending is not None or self.closed)
+                if self.pending is None:
+                    return
+                # Пачка сохранений подряд сливается в одну запись: новые
+                # сохранения будят поток, но срок прерывают только flush и close
+                while not self.closed and not self.flushing:
+                    remaining = self.deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self.condition.wait(remaining)
+                payload = self.pending
+                self.pending = None
+                self.writing = True
+            
+            try:
+                self.write_atomic(payload)
+            finally:
+                with self.condition:
+                    self.writing = False
+                    self.condition.notify_all()
+    
+    def write_atomic(self, payload):
+        """Запись во временный файл и переименование поверх целевого"""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, temp_path = tempfile.mkstemp(prefix='.player_data.', suffix='.tmp', dir=directory)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            # mkstemp создает файл только для владельца - права берутся от старого файла
+            try:
+                mode = os.stat(self.path).st_mode & 0o777
+            except OSError:
+                mode = 0o644
+            os.chmod(temp_path, mode)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            print(f"Ошибка сохранения: {e}")
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+            return
+        
+        # Переименование тоже должно пережить сбой питания
+        try:
+            dir_fd = os.open(directory, os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(dir_fd)
+        except OSError:
+            pass
+        finally:
+            os.close(dir_fd)
+    
+    def flush(self, timeout=None):
+        """Ожидание записи всех сохранений"""
+        with self.condition:
+            self.flushing = True
+            self.condition.notify_all()
+            done = self.condition.wait_for(
+                lambda: self.pending is None and not self.writing, timeout)
+            self.flushing = False
+            return done
+    
+    def close(self, timeout=None):
+        """Дописать очередь и остановить поток"""
+        self.flush(timeout)
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+        if self.thread is not None:
+            self.thread.join(timeout)
+
+class GameHistory:
+    """История всех сыгранных игр (SQLite)"""
+    
+    def __init__(self, path):
+        self.connection = sqlite3.connect(path)
+        self.connection.row_factory = sqlite3.Row
+        # WAL: коммит без fsync на каждую игру, данные сбрасываются при чекпойнте
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.executescript(HISTORY_SCHEMA)
+    
+    def query(self, sql, params=()):
+        """Строки запроса в виде словарей"""
+        return [dict(row) for row in self.connection.execute(sql, params)]
+    
+    def migrate(self, records):
+        """Обновление схемы; старая таблица рекордов из player_data.json переносится один раз"""
+        version = self.connection.execute('PRAGMA user_version').fetchone()[0]
+        if version >= HISTORY_SCHEMA_VERSION:
+            return
+        with self.connection:
+            if version < 2:
+                for column in HISTORY_LOG_COLUMNS:
+                    self.connection.execute(f'ALTER TABLE games ADD COLUMN {column}')
+            if version < 3:
+                self.connection.execute(f'ALTER TABLE games ADD COLUMN {HISTORY_MODE_COLUMN}')
+                for statement in HISTORY_INDEXES:
+                    self.connection.execute(statement)
+            if version < 1:
+                self.connection.executemany(
+                    f'INSERT INTO games ({HISTORY_FIELDS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    [(r['name'], r['score'], r['date'], r.get('bounces', 0), r.get('taps', 0),
+                      r.get('seed'), r.get('ticks'), r.get('tap_ticks'), r.get('mode', DEFAULT_MODE))
+                     for r in records]
+                )
+            self.connection.execute(f'PRAGMA user_version={HISTORY_SCHEMA_VERSION}')
+    
+    def add_game(self, name, score, date, bounces=0, taps=0, log=None):
+        """Запись сыгранной игры с журналом сессии (режим - из журнала)"""
+        log = log or {}
+        with self.connection:
+            self.connection.execute(
+                f'INSERT INTO games ({HISTORY_FIELDS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (name, score, date, bounces, taps,
+                 log.get('seed'), log.get('ticks'), log.get('tap_ticks'),
+                 log.get('mode', DEFAULT_MODE))
+            )
+    
+    def top_overall(self, limit=10, mode=DEFAULT_MODE):
+        """Лучшие игры режима (обход индекса mode, score с конца)"""
+        return self.query(
+            f'SELECT {HISTORY_FIELDS} FROM games '
+            'WHERE mode = ? ORDER BY score DESC LIMIT ?', (mode, limit))
+    
+    def top_by_character(self, name, limit=10, mode=DEFAULT_MODE):
+        """Лучшие игры персонажа в режиме (индекс mode, name, score)"""
+        return self.query(
+            f'SELECT {HISTORY_FIELDS} FROM games '
+            'WHERE mode = ? AND name = ? ORDER BY score DESC LIMIT ?', (mode, name, limit))
+    
+    def best_per_day(self, limit=10, mode=DEFAULT_MODE):
+        """Лучшая игра режима за каждый день, от новых дней к старым"""
+        # Дни перебираются прыжками по индексу (mode, date, score): каждый
+        # шаг - один поиск по индексу, а не просмотр всех игр за день
+        return self.query(
+            """
+            WITH RECURSIVE days(date) AS (
+                SELECT MAX(date) FROM games WHERE mode = :mode
+                UNION ALL
+                SELECT (SELECT MAX(date) FROM games WHERE mode = :mode AND date < days.date)
+                FROM days WHERE days.date IS NOT NULL
+                LIMIT :limit
+            )
+            SELECT g.name, g.score, g.date, g.bounces, g.taps, g.seed, g.ticks, g.tap_ticks, g.mode
+            FROM days JOIN games g ON g.id = (
+                SELECT id FROM games WHERE mode = :mode AND date = days.date
+                ORDER BY score DESC LIMIT 1
+            )
+            ORDER BY g.date DESC
+            """, {'mode': mode, 'limit': limit})
+    
+    def close(self):
+        """Закрытие базы"""
+        self.connection.close()
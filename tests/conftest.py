@@ -0,0 +1,5 @@
+"""Модули игры лежат в корне репозитория, рядом с папкой тестов"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
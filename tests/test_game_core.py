@@ -0,0 +1,117 @@
+"""Повтор сессий по журналу и пакетный режим против аналитического движка"""
+import math
+import random
+
+import pytest
+
+from game_core import (
+    CANVAS_HEIGHT, CANVAS_WIDTH, BOX_SIZE, GameSimulation, MultiBoxSimulation,
+    TrajectoryEngine, decode_ticks, encode_ticks, verify_session,
+)
+
+# Широкая зона угла: игры кончаются за секунды, повтор проверяется целиком
+DANGER_ZONE = 200
+TAP_RATE = 0.02
+MAX_TICKS = 60 * 120
+
+def play(simulation, seed):
+    """Живая игра со случайными нажатиями до угла; запись рекорда с журналом"""
+    sim = simulation(danger_zone=DANGER_ZONE)
+    sim.start(seed)
+    taps = random.Random(seed)
+    while sim.tick < MAX_TICKS:
+        if taps.random() < TAP_RATE:
+            sim.redirect()
+        if sim.step():
+            return dict(sim.session_log(), score=sim.score(), bounces=sim.bounces)
+    pytest.fail(f"игра {simulation.mode} с зерном {seed} не дошла до угла")
+
+@pytest.mark.parametrize('simulation', [GameSimulation, MultiBoxSimulation])
+@pytest.mark.parametrize('seed', [1, 2, 3])
+def test_live_session_replays(simulation, seed):
+    """Журнал живой игры с нажатиями повторяется до того же финального тика"""
+    record = play(simulation, seed)
+    assert record['mode'] == simulation.mode
+    assert verify_session(record, danger_zone=DANGER_ZONE) == (True, 'ok')
+
+@pytest.mark.parametrize('simulation', [GameSimulation, MultiBoxSimulation])
+def test_tampered_session_fails(simulation):
+    """Подправленный счет, зерно, нажатия или режим не проходят проверку"""
+    record = play(simulation, 4)
+    taps = decode_ticks(record['tap_ticks'])
+    assert len(taps) > 0
+    taps[0] += 1
+    
+    for tampered in (
+        dict(record, score=record['score'] + 1),
+        dict(record, ticks=record['ticks'] + 60, score=record['score'] + 1),
+        dict(record, seed=record['seed'] + 1),
+        dict(record, tap_ticks=encode_ticks(taps)),
+        dict(record, mode='unknown'),
+    ):
+        ok, reason = verify_session(tampered, danger_zone=DANGER_ZONE)
+        assert not ok, tampered
+        assert reason != 'ok'
+
+def test_record_without_mode_is_normal():
+    """Запись до появления режимов повторяется как обычная игра"""
+    record = play(GameSimulation, 5)
+    del record['mode']
+    assert verify_session(record, danger_zone=DANGER_ZONE) == (True, 'ok')
+
+def test_multi_replay_matches_swarm():
+    """Повтор сложного режима восстанавливает игрока и весь рой"""
+    sim = MultiBoxSimulation()
+    sim.start(6)
+    taps = random.Random(6)
+    for _ in range(600):
+        if taps.random() < TAP_RATE:
+            sim.redirect()
+        if sim.step():
+            break
+    
+    replay = MultiBoxSimulation()
+    replay.start(6)
+    for tick in decode_ticks(encode_ticks(sim.tap_ticks)):
+        replay.seek(tick)
+        replay.redirect()
+    replay.seek(sim.tick)
+    
+    assert (replay.box_x, replay.box_y, replay.bounces) == (sim.box_x, sim.box_y, sim.bounces)
+    for name in ('xs', 'ys', 'vxs', 'vys', 'colors'):
+        assert list(getattr(replay, name)) == list(getattr(sim, name)), name
+
+def test_ticks_roundtrip():
+    """Тики нажатий переживают кодирование в base64"""
+    ticks = [0, 1, 59, 60, 65535, 2 ** 32 - 1]
+    assert list(decode_ticks(encode_ticks(ticks))) == ticks
+    assert list(decode_ticks('')) == []
+    assert list(decode_ticks(None)) == []
+
+@pytest.mark.parametrize('zone', [100, 150])
+def test_batch_matches_engine(zone):
+    """Пакетный режим на NumPy дает те же времена входа в угол, что TrajectoryEngine"""
+    np = pytest.importorskip('numpy')
+    from game_core import BatchSimulation
+    
+    count = 300
+    speed = 4.0
+    max_ticks = 60 * 300
+    batch = BatchSimulation(count, speed, zone, seed=7).run(max_ticks)
+    
+    # Те же направления, что у пакета: первый вызов его генератора
+    angles = np.random.default_rng(7).uniform(0, 2 * math.pi, count)
+    expected = []
+    for angle in angles:
+        engine = TrajectoryEngine(zone)
+        engine.reset(0, (CANVAS_WIDTH - BOX_SIZE) / 2.0, (CANVAS_HEIGHT - BOX_SIZE) / 2.0,
+                     math.cos(angle) * speed, math.sin(angle) * speed)
+        while math.isinf(engine.corner_time) and engine.bounce_time <= max_ticks:
+            engine.advance_to(engine.bounce_time)
+        expected.append(engine.corner_time if engine.corner_time <= max_ticks else math.inf)
+    expected = np.array(expected)
+    
+    finite = np.isfinite(expected)
+    assert finite.any()
+    assert np.array_equal(finite, np.isfinite(batch))
+    assert np.allclose(batch[finite], expected[finite], rtol=0, atol=1e-6)
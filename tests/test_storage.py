@@ -0,0 +1,121 @@
+"""Миграции истории игр SQLite от каждой прошлой версии схемы"""
+import sqlite3
+
+import pytest
+
+from storage import DEFAULT_MODE, HISTORY_SCHEMA_VERSION, GameHistory
+
+# Таблица версий 1 и 2 (версия 2 добавила журнал сессии) и их индексы
+OLD_SCHEMA = """
+CREATE TABLE games (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    score REAL NOT NULL,
+    date TEXT NOT NULL,
+    bounces INTEGER NOT NULL DEFAULT 0,
+    taps INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX games_score ON games (score);
+CREATE INDEX games_name_score ON games (name, score);
+CREATE INDEX games_date_score ON games (date, score);
+"""
+LOG_COLUMNS = ('seed INTEGER', 'ticks INTEGER', 'tap_ticks TEXT')
+
+# Таблица рекордов из player_data.json до истории в SQLite
+JSON_RECORDS = [
+    {'name': 'Дуайт Шрут', 'score': 12.5, 'date': '2024-01-02'},
+    {'name': 'Пэм Бисли', 'score': 30.0, 'date': '2024-01-01'},
+]
+
+def old_database(path, version):
+    """База версии version с двумя играми"""
+    connection = sqlite3.connect(path)
+    connection.executescript(OLD_SCHEMA)
+    if version >= 2:
+        for column in LOG_COLUMNS:
+            connection.execute(f'ALTER TABLE games ADD COLUMN {column}')
+        connection.execute(
+            "INSERT INTO games (name, score, date, bounces, taps, seed, ticks, tap_ticks) "
+            "VALUES ('Джим Халперт', 20.0, '2024-02-01', 3, 1, 42, 1200, 'AQAAAA==')")
+    else:
+        connection.execute(
+            "INSERT INTO games (name, score, date, bounces, taps) "
+            "VALUES ('Джим Халперт', 20.0, '2024-02-01', 3, 1)")
+    connection.execute(
+        "INSERT INTO games (name, score, date) VALUES ('Майкл Скотт', 5.0, '2024-02-02')")
+    connection.execute(f'PRAGMA user_version={version}')
+    connection.commit()
+    connection.close()
+
+def schema(history):
+    """Версия, столбцы и индексы таблицы games"""
+    connection = history.connection
+    version = connection.execute('PRAGMA user_version').fetchone()[0]
+    columns = {row[1] for row in connection.execute('PRAGMA table_info(games)')}
+    indexes = {row[1] for row in connection.execute('PRAGMA index_list(games)')}
+    return version, columns, indexes
+
+def assert_current_schema(history):
+    """Схема последней версии: журнал, режим и индексы по режиму"""
+    version, columns, indexes = schema(history)
+    assert version == HISTORY_SCHEMA_VERSION
+    assert {'seed', 'ticks', 'tap_ticks', 'mode'} <= columns
+    assert indexes == {'games_mode_score', 'games_mode_name_score', 'games_mode_date_score'}
+
+@pytest.mark.parametrize('version', [1, 2])
+def test_old_database_upgrades(tmp_path, version):
+    """База версии 1 или 2 обновляется, старые игры попадают в обычный режим"""
+    path = str(tmp_path / 'game_history.db')
+    old_database(path, version)
+    
+    history = GameHistory(path)
+    history.migrate(JSON_RECORDS)
+    assert_current_schema(history)
+    
+    # Рекорды из JSON переносятся только в новую базу, не повторно
+    games = history.top_overall(10)
+    assert [(game['name'], game['score'], game['mode']) for game in games] == [
+        ('Джим Халперт', 20.0, DEFAULT_MODE),
+        ('Майкл Скотт', 5.0, DEFAULT_MODE),
+    ]
+    assert games[0]['bounces'] == 3 and games[0]['taps'] == 1
+    if version >= 2:
+        assert (games[0]['seed'], games[0]['ticks'], games[0]['tap_ticks']) == (42, 1200, 'AQAAAA==')
+    else:
+        assert games[0]['seed'] is None and games[0]['ticks'] is None
+    history.close()
+
+def test_new_database_imports_json_records(tmp_path):
+    """Новая база создается сразу в последней версии и один раз берет рекорды из JSON"""
+    path = str(tmp_path / 'game_history.db')
+    history = GameHistory(path)
+    history.migrate(JSON_RECORDS)
+    assert_current_schema(history)
+    assert [game['score'] for game in history.top_overall(10)] == [30.0, 12.5]
+    history.close()
+    
+    # Повторное открытие ничего не меняет
+    history = GameHistory(path)
+    history.migrate(JSON_RECORDS)
+    assert_current_schema(history)
+    assert len(history.top_overall(10)) == 2
+    history.close()
+
+def test_tables_filter_by_mode(tmp_path):
+    """Таблицы рекордов обычного и сложного режимов не смешиваются"""
+    history = GameHistory(str(tmp_path / 'game_history.db'))
+    history.migrate([])
+    history.add_game('Пэм Бисли', 10.0, '2024-03-01', log={'mode': 'normal', 'seed': 1, 'ticks': 600})
+    history.add_game('Пэм Бисли', 50.0, '2024-03-01', log={'mode': 'multi', 'seed': 2, 'ticks': 3000})
+    history.add_game('Пэм Бисли', 40.0, '2024-03-02', log={'mode': 'multi', 'seed': 3, 'ticks': 2400})
+    history.add_game('Кевин Малоун', 20.0, '2024-03-02')
+    
+    assert [game['score'] for game in history.top_overall(10)] == [20.0, 10.0]
+    assert [game['score'] for game in history.top_overall(10, 'multi')] == [50.0, 40.0]
+    assert [game['score'] for game in history.top_by_character('Пэм Бисли', 10)] == [10.0]
+    assert [game['score'] for game in history.top_by_character('Пэм Бисли', 10, 'multi')] == [50.0, 40.0]
+    assert [(game['date'], game['score']) for game in history.best_per_day(10)] == [
+        ('2024-03-02', 20.0), ('2024-03-01', 10.0)]
+    assert [(game['date'], game['score']) for game in history.best_per_day(10, 'multi')] == [
+        ('2024-03-02', 40.0), ('2024-03-01', 50.0)]
+    history.close()